@@ -1,6 +1,21 @@
-from minesweeper.utils import read_field, print_field, write_field
+from minesweeper.utils import (
+    read_field,
+    print_field,
+    write_field,
+    iter_fields,
+    write_fields,
+)
 from minesweeper.brute_force_solver import brute_force_solve
 from minesweeper.backtracking_solver import backtracking_solve
 from minesweeper.a_star_solver import a_star_solve
 from minesweeper.experiment import a_star_solve_inc
 from minesweeper.pysat_solver import pysat_solve
+from minesweeper.dpll_solver import dpll_solve
+from minesweeper.session import SolverSession
+from minesweeper.probability import mine_probabilities
+from minesweeper.batch import solve_many
+from minesweeper.cache import ComponentCache
+from minesweeper.stats import SolveStats
+from minesweeper.array_field import ArrayField
+from minesweeper.model_count import ModelCounter, count_models
+from minesweeper.service import SolveService, solve_async
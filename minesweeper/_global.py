@@ -6,11 +6,20 @@ from collections import namedtuple
 Field: TypeAlias = list[list[int]]
 Clause: TypeAlias = list[int]
 
+# "Exactly `count` of `vars` are mines", stored as is instead of expanded to CNF.
+# With a slack, between `count - slack` and `count` of them are mines.
+Constraint = namedtuple("Constraint", ["vars", "count", "slack"], defaults=[0])
+
 UNOPENED_VAL = -2
 FLAGGED_VAL = -1
+# Only in the results of the solvers
+SAFE_VAL = -3
+UNKNOWN_VAL = -4
 
 UNOPENED_CHAR = "_"
 FLAGGED_CHAR = "X"
+SAFE_CHAR = "O"
+UNKNOWN_CHAR = "?"
 
 
 class Answer(Enum):
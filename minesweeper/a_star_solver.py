@@ -1,18 +1,27 @@
-from minesweeper._global import Field, FLAGGED_VAL
-from minesweeper.solver import KB, construct_CNF_clauses
+from minesweeper._global import Field, Constraint
+from minesweeper.solver import (
+    KB,
+    CountKB,
+    Search,
+    deduce_field,
+    encode_CNF,
+    split_wide,
+)
+from minesweeper.numpy_kb import NumpyKB
+from minesweeper.cache import ComponentCache
+from minesweeper.stats import SolveStats
+from minesweeper.budget import Budget, make_budget
 
-import copy
 import heapq
-import time
 from recordclass import dataobject
 from typing import Generator
 
 
 class Node(dataobject):
-    state: tuple[bool | None]
+    state: int | tuple[int, int]
     h: int | float
 
-    def __init__(self, state: tuple[bool | None], h: int | float):
+    def __init__(self, state: int | tuple[int, int], h: int | float):
         self.state = state
         self.h = h
 
@@ -20,31 +29,60 @@ class Node(dataobject):
         return self.h < other.h
 
 
-def gen_state(kb: KB, model: dict[int, bool]) -> tuple[bool | None]:
-    return tuple(model[var] if var in model else False for var in kb.vars)
+def check_explored(explored: set, max_explored: int | None) -> None:
+    if max_explored is not None and len(explored) >= max_explored:
+        raise MemoryError(
+            f"A* search aborted: explored set reached {max_explored} states"
+        )
 
 
-def child_states(
-    parent_state: tuple[bool | None], exclude: int
-) -> Generator[tuple[bool | None], None, None]:
-    for i, val in enumerate(parent_state):
-        if i != exclude:
-            yield parent_state[:i] + (not val,) + parent_state[i + 1 :]
+def gen_state(kb: KB, model: dict[int, bool]) -> int:
+    """Bitmask of a model, bit i is the value of `kb.vars[i]` (False if missing)"""
+    state = 0
+    for i, var in enumerate(kb.vars):
+        if model.get(var, False):
+            state |= 1 << i
+    return state
+
 
+def gen_model(kb: KB, state: int) -> dict[int, bool]:
+    return {var: bool(state >> i & 1) for i, var in enumerate(kb.vars)}
+
+
+def child_states(
+    parent_state: int, n: int, fixed: set[int]
+) -> Generator[tuple[int, int], None, None]:
+    for i in range(n):
+        if i not in fixed:
+            yield i, parent_state ^ (1 << i)
+
+
+def a_star_search(
+    kb: KB,
+    init_model: dict[int, bool],
+    max_explored: int | None = None,
+    stats: SolveStats | None = None,
+    budget: Budget | None = None,
+    counts: CountKB | None = None,
+) -> dict[int, bool] | None:
+    # Variables of the initial model are assumptions, they are never flipped
+    fixed = {kb.idx_dict[var] for var in init_model}
 
-def a_star_search(kb: KB, init_model: dict[int, bool], exclude: int = -1) -> bool:
     state = gen_state(kb, init_model)
-    node = Node(state, kb.num_false_clauses(state))
+    h = kb.num_false_clauses(state)
+    if counts is not None:
+        h += counts.distance(state)
+    node = Node(state, h)
 
     frontier: list[Node] = []
     heapq.heappush(frontier, node)
-    explored: set[tuple[bool | None]] = set()
+    explored: set[int] = set()
 
-    l = len(kb.clauses)
+    n = len(kb.vars)
 
     while True:
         if not frontier:
-            return False
+            return None
 
         node = heapq.heappop(frontier)
 
@@ -56,42 +94,79 @@ def a_star_search(kb: KB, init_model: dict[int, bool], exclude: int = -1) -> boo
         #     return True
 
         if node.h == 0:
-            return True
+            return gen_model(kb, node.state)
 
+        check_explored(explored, max_explored)
         explored.add(node.state)
+        if stats is not None:
+            stats.nodes += 1
+            stats.explored = max(stats.explored, len(explored))
+        if budget is not None:
+            budget.tick()
+
+        children = [
+            (i, child_state)
+            for i, child_state in child_states(node.state, n, fixed)
+            if child_state not in explored
+        ]
+        if not children:
+            continue
 
-        for child_state in child_states(node.state, exclude):
-            if child_state in explored:
-                continue
-
-            heapq.heappush(
-                frontier, Node(child_state, kb.num_false_clauses(child_state))
-            )
+        # A flip only changes the clauses containing the flipped variable, so
+        # the children are scored from the parent's heuristic
+        idxs = [i for i, _ in children]
+        deltas = kb.flip_deltas(node.state, idxs)
+        if counts is not None:
+            deltas = [
+                delta + count_delta
+                for delta, count_delta in zip(
+                    deltas, counts.flip_deltas(node.state, idxs)
+                )
+            ]
+        for (_, child_state), delta in zip(children, deltas):
+            heapq.heappush(frontier, Node(child_state, node.h + delta))
+        if stats is not None:
+            stats.frontier_peak = max(stats.frontier_peak, len(frontier))
 
 
 def a_star_solve(
-    field: Field, check_field: bool = False, display_checking_time: bool = True
+    field: Field,
+    check_field: bool = False,
+    display_checking_time: bool = True,
+    use_numpy: bool = False,
+    max_explored: int | None = None,
+    cache: ComponentCache | None = None,
+    stats: SolveStats | None = None,
+    deadline: float | None = None,
+    max_nodes: int | None = None,
+    mark_safe: bool = False,
+    total_mines: int | None = None,
+    budget: Budget | None = None,
 ) -> Field:
-    clauses, vars_ = construct_CNF_clauses(field)
-    kb = KB(clauses, vars_, create_idx_dict=True)
-
-    if check_field:
-        start = 0
-        if display_checking_time:
-            start = time.process_time()
-
-        if not a_star_search(kb, {}):
-            raise ValueError("Unsolvable grid")
-
-        if display_checking_time:
-            print("check: ", time.process_time() - start, "s")
-
-    height = len(field)
-    width = len(field[0])
-
-    flagged_field = copy.deepcopy(field)
-    for i, var in enumerate(vars_):
-        if not a_star_search(kb, {var: False}, i):
-            flagged_field[(var - 1) // width][(var - 1) % width] = FLAGGED_VAL
-
-    return flagged_field
+    if budget is None:
+        budget = make_budget(deadline, max_nodes)
+
+    kb_class = NumpyKB if use_numpy else KB
+
+    def create_search(constraints: list[Constraint], vars_: list[int]) -> Search:
+        # The global mine count is counted on the states, not encoded
+        narrow, wide = split_wide(constraints)
+        kb = kb_class(*encode_CNF(narrow, vars_), create_idx_dict=True)
+        counts = CountKB(wide, kb.idx_dict) if wide else None
+        if stats is not None:
+            stats.clauses += len(kb.clauses) + len(wide)
+        return lambda assumptions: a_star_search(
+            kb, assumptions, max_explored, stats, budget, counts
+        )
+
+    return deduce_field(
+        field,
+        create_search,
+        check_field,
+        display_checking_time,
+        cache,
+        stats,
+        budget,
+        mark_safe,
+        total_mines,
+    )
@@ -0,0 +1,173 @@
+from minesweeper._global import Field, UNOPENED_VAL
+
+from array import array
+from functools import lru_cache
+from itertools import chain
+from typing import Iterator, overload
+
+
+@lru_cache(maxsize=64)
+def neighbor_table(height: int, width: int) -> tuple[tuple[int, ...], ...]:
+    """Flat indices of the neighbors of every cell of a board shape, in row
+    major order, computed once per shape"""
+    return tuple(
+        tuple(
+            y * width + x
+            for y in range(max(0, i - 1), min(height, i + 2))
+            for x in range(max(0, j - 1), min(width, j + 2))
+            if y != i or x != j
+        )
+        for i in range(height)
+        for j in range(width)
+    )
+
+
+class ArrayField:
+    """Field stored as one flat `array('b')`, row after row
+
+    Cell (i, j) is at index `i * width + j`, i.e. the variable of the cell minus
+    one. Copies share the array until one of them is written to, so a solver can
+    return a copy with a few flags for the cost of a single array copy.
+
+    It can be used like a `Field`: `field[i]` is a `Row` view, so
+    `field[i][j] = value` writes the cell, like `field[i, j] = value` and
+    `set_cell` do.
+    """
+
+    __slots__ = ("height", "width", "cells", "owned")
+
+    def __init__(self, height: int, width: int, cells: array | None = None) -> None:
+        self.height = height
+        self.width = width
+        if cells is None:
+            cells = array("b", [UNOPENED_VAL]) * (height * width)
+        self.cells = cells
+        # False while the array may be shared with a copy
+        self.owned = True
+
+    @classmethod
+    def from_field(cls, field: "Field | ArrayField") -> "ArrayField":
+        if isinstance(field, ArrayField):
+            return field.copy()
+        width = len(field[0]) if field else 0
+        return cls(len(field), width, array("b", chain.from_iterable(field)))
+
+    def to_field(self) -> Field:
+        cells, width = self.cells, self.width
+        return [cells[i : i + width].tolist() for i in range(0, len(cells), width)]
+
+    def copy(self) -> "ArrayField":
+        other = ArrayField(self.height, self.width, self.cells)
+        other.owned = self.owned = False
+        return other
+
+    def __deepcopy__(self, memo: dict) -> "ArrayField":
+        return self.copy()
+
+    def set_cell(self, index: int, value: int) -> None:
+        """Write the cell at a flat index"""
+        if not self.owned:
+            self.cells = array("b", self.cells)
+            self.owned = True
+        self.cells[index] = value
+
+    def __len__(self) -> int:
+        return self.height
+
+    @overload
+    def __getitem__(self, key: int) -> "Row": ...
+
+    @overload
+    def __getitem__(self, key: tuple[int, int]) -> int: ...
+
+    def __getitem__(self, key: int | tuple[int, int]) -> "Row | int":
+        if isinstance(key, tuple):
+            i, j = key
+            return self.cells[i * self.width + j]
+        if key < 0:
+            key += self.height
+        if not 0 <= key < self.height:
+            raise IndexError("ArrayField row index out of range")
+        return Row(self, key)
+
+    def __setitem__(self, key: tuple[int, int], value: int) -> None:
+        i, j = key
+        self.set_cell(i * self.width + j, value)
+
+    def __iter__(self) -> Iterator["Row"]:
+        for i in range(self.height):
+            yield self[i]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ArrayField):
+            return (self.height, self.width, self.cells) == (
+                other.height,
+                other.width,
+                other.cells,
+            )
+        if isinstance(other, list):
+            return self.to_field() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ArrayField({self.to_field()!r})"
+
+
+class Row:
+    """Writable view of a row of an `ArrayField`
+
+    Reads and writes go to the field, so a write is seen by the field (and
+    copies it first when its array is shared). Slices are lists (copies).
+    """
+
+    __slots__ = ("field", "start")
+
+    def __init__(self, field: ArrayField, i: int) -> None:
+        self.field = field
+        self.start = i * field.width
+
+    def index(self, j: int) -> int:
+        width = self.field.width
+        if j < 0:
+            j += width
+        if not 0 <= j < width:
+            raise IndexError("ArrayField column index out of range")
+        return self.start + j
+
+    def tolist(self) -> list[int]:
+        return self.field.cells[self.start : self.start + self.field.width].tolist()
+
+    def copy(self) -> list[int]:
+        return self.tolist()
+
+    @overload
+    def __getitem__(self, key: int) -> int: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> list[int]: ...
+
+    def __getitem__(self, key: int | slice) -> int | list[int]:
+        if isinstance(key, slice):
+            return self.tolist()[key]
+        return self.field.cells[self.index(key)]
+
+    def __setitem__(self, key: int, value: int) -> None:
+        if isinstance(key, slice):
+            raise TypeError("ArrayField rows cannot be resized, write the cells")
+        self.field.set_cell(self.index(key), value)
+
+    def __len__(self) -> int:
+        return self.field.width
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Row):
+            return self.tolist() == other.tolist()
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Row({self.tolist()!r})"
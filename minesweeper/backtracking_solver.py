@@ -1,56 +1,84 @@
-from minesweeper._global import Field, Answer, FLAGGED_VAL
-from minesweeper.solver import KB, construct_CNF_clauses
-
-import copy
-import time
+from minesweeper._global import Field, Answer, Constraint
+from minesweeper.solver import CardinalityKB, Search, deduce_field, encode_CNF
+from minesweeper.dpll_solver import DPLL
+from minesweeper.cache import ComponentCache
+from minesweeper.stats import SolveStats
+from minesweeper.budget import Budget, make_budget
 
 
 def backtracking_search(
-    kb: KB, model: dict[int, bool], exclude: int = -1, idx: int = 0
-) -> bool:
+    kb: CardinalityKB,
+    model: dict[int, bool],
+    idx: int = 0,
+    stats: SolveStats | None = None,
+    budget: Budget | None = None,
+) -> dict[int, bool] | None:
+    if stats is not None:
+        stats.nodes += 1
+    if budget is not None:
+        budget.tick()
+
     ans, _ = kb.is_satisfied_extended(model)
     if ans == Answer.TRUE:
-        return True
+        return model
     if ans == Answer.FALSE:
-        return False
+        return None
 
-    if idx == exclude:
-        return backtracking_search(kb, model, exclude, idx + 1)
     if idx == len(kb.vars):
-        return False
+        return None
+    if kb.vars[idx] in model:
+        return backtracking_search(kb, model, idx + 1, stats, budget)
 
     for val in (False, True):
         child_model = model.copy()
         child_model[kb.vars[idx]] = val
-        if backtracking_search(kb, child_model, exclude, idx + 1):
-            return True
+        found = backtracking_search(kb, child_model, idx + 1, stats, budget)
+        if found is not None:
+            return found
 
-    return False
+    return None
 
 
 def backtracking_solve(
-    field: Field, check_field: bool = False, display_checking_time: bool = True
+    field: Field,
+    check_field: bool = False,
+    display_checking_time: bool = True,
+    cache: ComponentCache | None = None,
+    stats: SolveStats | None = None,
+    deadline: float | None = None,
+    max_nodes: int | None = None,
+    mark_safe: bool = False,
+    total_mines: int | None = None,
+    cdcl: bool = False,
+    budget: Budget | None = None,
 ) -> Field:
-    clauses, vars_ = construct_CNF_clauses(field)
-    kb = KB(clauses, vars_, create_idx_dict=True)
-
-    if check_field:
-        start = 0
-        if display_checking_time:
-            start = time.process_time()
-
-        if not backtracking_search(kb, {}):
-            raise ValueError("Unsolvable grid")
-
-        if display_checking_time:
-            print("check: ", time.process_time() - start, "s")
+    if budget is None:
+        budget = make_budget(deadline, max_nodes)
 
-    height = len(field)
-    width = len(field[0])
+    def create_search(constraints: list[Constraint], vars_: list[int]) -> Search:
+        if cdcl:
+            # Chronological backtracking forgets its dead ends between the
+            # queries of `find_backbone`, the learned clauses are kept instead
+            clauses, cnf_vars = encode_CNF(constraints, vars_)
+            if stats is not None:
+                stats.clauses += len(clauses)
+            return DPLL(clauses, cnf_vars, stats, budget, learn=True).solve
 
-    flagged_field = copy.deepcopy(field)
-    for i, var in enumerate(vars_):
-        if not backtracking_search(kb, {var: False}, i):
-            flagged_field[(var - 1) // width][(var - 1) % width] = FLAGGED_VAL
+        kb = CardinalityKB(constraints, vars_, create_idx_dict=True)
+        if stats is not None:
+            stats.clauses += len(constraints)
+        return lambda assumptions: backtracking_search(
+            kb, assumptions, 0, stats, budget
+        )
 
-    return flagged_field
+    return deduce_field(
+        field,
+        create_search,
+        check_field,
+        display_checking_time,
+        cache,
+        stats,
+        budget,
+        mark_safe,
+        total_mines,
+    )
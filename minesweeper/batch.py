@@ -0,0 +1,121 @@
+from minesweeper._global import Field, UNOPENED_VAL
+from minesweeper.registry import get_solver
+from minesweeper.stats import SolveStats
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Generator, Iterable
+
+# Solver of the current worker process, set up once by `init_worker`
+_worker_solve: Callable[..., Field] | None = None
+_worker_kwargs: dict[str, Any] = {}
+# Arguments that choose the engine, and so what the warm-up has to load
+ENGINE_KWARGS = ("backend", "use_numpy", "cdcl")
+
+
+def init_worker(solver: str, kwargs: dict[str, Any]) -> None:
+    global _worker_solve, _worker_kwargs
+
+    _worker_solve = get_solver(solver)
+    _worker_kwargs = kwargs
+
+    # Solve a tiny field once, so that the modules and native libraries are
+    # loaded before the first real board arrives. Solver instances are not
+    # kept, building one costs less than a solve. The other arguments, like
+    # `total_mines`, may not fit the tiny field, and a failure here would break
+    # the pool: the errors are left to the real solves to report.
+    engine_kwargs = {key: kwargs[key] for key in ENGINE_KWARGS if key in kwargs}
+    try:
+        _worker_solve([[1, UNOPENED_VAL]], False, False, **engine_kwargs)
+    except Exception:
+        pass
+
+
+def solve_in_worker(
+    index: int, field: Field, timeout: float | None
+) -> tuple[int, Field | Exception]:
+    assert _worker_solve is not None
+
+    kwargs = _worker_kwargs
+    stats = None
+    if timeout is not None:
+        # The deadline of the budget also interrupts the native solvers, which
+        # a signal handler can not. The statistics tell if it was reached.
+        stats = SolveStats()
+        kwargs = {**kwargs, "deadline": time.monotonic() + timeout, "stats": stats}
+    try:
+        result = _worker_solve(field, **kwargs)
+    except Exception as e:
+        return index, e
+
+    if stats is not None and stats.budget_exceeded:
+        return index, TimeoutError("Solving took too long")
+    return index, result
+
+
+def solve_many(
+    fields: Iterable[Field],
+    solver: str = "pysat",
+    workers: int | None = None,
+    timeout: float | None = None,
+    ordered: bool = False,
+    **kwargs: Any,
+) -> Generator[tuple[int, Field | Exception], None, None]:
+    """Solve many fields on a pool of processes, streaming the results
+
+    Args:
+        fields (Iterable[Field]): The fields to solve, consumed lazily
+        solver (str, optional): Name of the solver (see `SOLVERS`). Defaults to
+            "pysat".
+        workers (int | None, optional): Number of processes. Defaults to the
+            number of CPUs.
+        timeout (float | None, optional): Seconds allowed for the search of
+            each field. Defaults to None.
+        ordered (bool, optional): Yield the results in the order of `fields`
+            instead of as soon as they finish. Defaults to False.
+        **kwargs: Passed to the solver, e.g. `check_field`
+
+    Yields:
+        tuple[int, Field | Exception]: index of the field in `fields` and its
+            solution, or the exception raised while solving it (TimeoutError
+            when it ran out of time)
+    """
+
+    get_solver(solver)  # Fail early on unknown names
+    workers = workers or os.cpu_count() or 1
+    # Bound the number of fields in flight, so that `fields` can be a stream
+    max_pending = 4 * workers
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(solver, kwargs)
+    ) as executor:
+        fields_iter = enumerate(fields)
+        pending: set[Future] = set()
+        exhausted = False
+
+        finished: dict[int, Field | Exception] = {}
+        next_index = 0
+
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                item = next(fields_iter, None)
+                if item is None:
+                    exhausted = True
+                else:
+                    pending.add(executor.submit(solve_in_worker, *item, timeout))
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, result = future.result()
+                if not ordered:
+                    yield index, result
+                    continue
+
+                finished[index] = result
+                while next_index in finished:
+                    yield next_index, finished.pop(next_index)
+                    next_index += 1
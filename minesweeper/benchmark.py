@@ -0,0 +1,362 @@
+from minesweeper._global import Field, UNOPENED_VAL
+from minesweeper.registry import SOLVERS, get_solver
+from minesweeper.solver import construct_constraints, propagate, to_CNF_clauses
+from minesweeper.stats import SolveStats
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+
+def generate_board(
+    seed: int, height: int, width: int, density: float, openings: int = 1
+) -> Field:
+    """Random field, as seen after a few clicks of a real game
+
+    Mines are placed uniformly, then `openings` safe cells (zeros when there are
+    some) are opened and the zeros flood open their neighbors.
+
+    Args:
+        seed (int): Seed of the random generator, the same seed gives the same
+            field
+        height (int): Number of rows
+        width (int): Number of columns
+        density (float): Fraction of the cells that are mines
+        openings (int, optional): Number of clicks. Defaults to 1.
+
+    Returns:
+        Field: The field, with the unopened cells set to `UNOPENED_VAL`
+    """
+
+    rng = random.Random(seed)
+    cells = [(i, j) for i in range(height) for j in range(width)]
+    mines = set(rng.sample(cells, round(density * height * width)))
+
+    def neighbors(i: int, j: int) -> list[tuple[int, int]]:
+        return [
+            (y, x)
+            for y in range(max(0, i - 1), min(height, i + 2))
+            for x in range(max(0, j - 1), min(width, j + 2))
+            if y != i or x != j
+        ]
+
+    numbers = {cell: sum(n in mines for n in neighbors(*cell)) for cell in cells}
+    field = [[UNOPENED_VAL] * width for _ in range(height)]
+
+    safe = [cell for cell in cells if cell not in mines]
+    zeros = [cell for cell in safe if numbers[cell] == 0]
+    for start in rng.sample(zeros or safe, min(openings, len(zeros or safe))):
+        stack = [start]
+        while stack:
+            i, j = stack.pop()
+            if field[i][j] != UNOPENED_VAL:
+                continue
+            field[i][j] = numbers[(i, j)]
+            if numbers[(i, j)] == 0:
+                stack.extend(neighbors(i, j))
+
+    return field
+
+
+def count_clauses(field: Field) -> dict[str, int]:
+    """Size of the problem given to the solvers, before and after propagation"""
+    constraints, vars_ = construct_constraints(field)
+    _, _, residual, residual_vars = propagate(constraints, vars_)
+    return {
+        "vars": len(vars_),
+        "clauses": len(to_CNF_clauses(constraints)),
+        "residual_vars": len(residual_vars),
+        "residual_clauses": len(to_CNF_clauses(residual)),
+    }
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_once(
+    solve,
+    field: Field,
+    timeout: float | None,
+    kwargs: dict[str, Any],
+    stats: SolveStats | None = None,
+) -> float:
+    """Solve a field once, returns the wall-clock time it took
+
+    Raises:
+        TimeoutError: when the solve ran out of time
+    """
+    if timeout is not None:
+        # The deadline of the budget also interrupts the native solvers
+        stats = stats or SolveStats()
+        kwargs = {**kwargs, "deadline": time.monotonic() + timeout}
+    if stats is not None:
+        kwargs = {**kwargs, "stats": stats}
+
+    start = time.perf_counter()
+    solve(field, False, False, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    if stats is not None and stats.budget_exceeded:
+        raise TimeoutError("Solving took too long")
+    return elapsed
+
+
+def benchmark(
+    solvers: list[str] | None = None,
+    sizes: list[tuple[int, int]] | None = None,
+    densities: list[float] | None = None,
+    boards: int = 5,
+    trials: int = 3,
+    seed: int = 0,
+    timeout: float | None = None,
+    solver_kwargs: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Time the solvers on generated fields
+
+    Every (size, density) pair gets `boards` fields, the same for all solvers.
+    Each field is solved `trials` times, plus once more under `tracemalloc` to
+    measure the peak memory (Python allocations only, not native solvers) and
+    collect the `SolveStats` of the solver.
+
+    Args:
+        solvers (list[str] | None, optional): Names of the solvers (see
+            `SOLVERS`). Defaults to all of them.
+        sizes (list[tuple[int, int]] | None, optional): (height, width) of the
+            fields. Defaults to [(9, 9)].
+        densities (list[float] | None, optional): Mine densities. Defaults to
+            [0.15].
+        boards (int, optional): Fields per (size, density). Defaults to 5.
+        trials (int, optional): Timed runs per field. Defaults to 3.
+        seed (int, optional): Seed of the first field. Defaults to 0.
+        timeout (float | None, optional): Seconds allowed per run, given to the
+            solver as a deadline. A field that runs out of time is skipped.
+            Defaults to None.
+        solver_kwargs (dict[str, dict[str, Any]] | None, optional): Extra
+            arguments of each solver, by name. Defaults to None.
+
+    Returns:
+        dict[str, Any]: "meta" (settings and environment) and "results", one
+            entry per solver, size and density. `sat_calls` and `nodes` are
+            averages over the fields solved in time, `error_messages` has the
+            type and message of the exception raised on each failed field.
+    """
+
+    sizes = sizes or [(9, 9)]
+    densities = densities or [0.15]
+
+    solvers = solvers or list(SOLVERS)
+    solver_kwargs = solver_kwargs or {}
+
+    results = []
+    for height, width in sizes:
+        for density in densities:
+            fields = [
+                generate_board(seed + k, height, width, density) for k in range(boards)
+            ]
+            sizes_info = [count_clauses(field) for field in fields]
+
+            for name in solvers:
+                solve = get_solver(name)
+                kwargs = solver_kwargs.get(name, {})
+                times: list[float] = []
+                peak_memory = 0
+                sat_calls = nodes = solved = 0
+                timeouts = 0
+                errors: list[str] = []
+
+                for field in fields:
+                    try:
+                        field_times = [
+                            run_once(solve, field, timeout, kwargs)
+                            for _ in range(trials)
+                        ]
+
+                        stats = SolveStats()
+                        tracemalloc.start()
+                        try:
+                            run_once(solve, field, timeout, kwargs, stats)
+                            peak_memory = max(
+                                peak_memory, tracemalloc.get_traced_memory()[1]
+                            )
+                        finally:
+                            tracemalloc.stop()
+                    except TimeoutError:
+                        timeouts += 1
+                    except Exception as e:
+                        errors.append(f"{type(e).__name__}: {e}")
+                    else:
+                        times.extend(field_times)
+                        sat_calls += stats.sat_calls
+                        nodes += stats.nodes
+                        solved += 1
+
+                entry: dict[str, Any] = {
+                    "solver": name,
+                    "height": height,
+                    "width": width,
+                    "density": density,
+                    "boards": boards,
+                    "timeouts": timeouts,
+                    "errors": len(errors),
+                    "error_messages": errors,
+                    "median": statistics.median(times) if times else None,
+                    "p95": percentile(times, 95) if times else None,
+                    "peak_memory": peak_memory,
+                    "sat_calls": sat_calls / solved if solved else None,
+                    "nodes": nodes / solved if solved else None,
+                }
+                for key in sizes_info[0] if sizes_info else []:
+                    entry[key] = statistics.mean(info[key] for info in sizes_info)
+                results.append(entry)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "boards": boards,
+            "trials": trials,
+            "seed": seed,
+            "timeout": timeout,
+        },
+        "results": results,
+    }
+
+
+# Smallest changes reported by `compare`, below them the noise dominates
+MIN_TIME_DELTA = 1e-3  # seconds
+MIN_MEMORY_DELTA = 64 * 1024  # bytes
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.2
+) -> list[str]:
+    """Regressions of a benchmark run against a previous one
+
+    A metric regresses when it grows by more than `threshold` and by more than
+    `MIN_TIME_DELTA` (times) or `MIN_MEMORY_DELTA` (peak memory).
+
+    Args:
+        baseline (dict[str, Any]): Output of `benchmark` to compare to
+        current (dict[str, Any]): Output of `benchmark` to check
+        threshold (float, optional): Allowed relative slowdown (or memory
+            growth). Defaults to 0.2.
+
+    Returns:
+        list[str]: description of each regression, empty if there is none
+    """
+
+    def key(entry: dict[str, Any]) -> tuple:
+        return entry["solver"], entry["height"], entry["width"], entry["density"]
+
+    previous = {key(entry): entry for entry in baseline["results"]}
+    regressions = []
+
+    for entry in current["results"]:
+        old = previous.get(key(entry))
+        if old is None:
+            continue
+
+        name = "{} {}x{} {}".format(*key(entry))
+        if entry["timeouts"] + entry["errors"] > old["timeouts"] + old["errors"]:
+            regressions.append(f"{name}: more fields failed or timed out")
+
+        for metric, min_delta in (
+            ("median", MIN_TIME_DELTA),
+            ("p95", MIN_TIME_DELTA),
+            ("peak_memory", MIN_MEMORY_DELTA),
+        ):
+            if old[metric] and entry[metric] is not None:
+                ratio = entry[metric] / old[metric]
+                if ratio > 1 + threshold and entry[metric] - old[metric] >= min_delta:
+                    regressions.append(
+                        f"{name}: {metric} {old[metric]:.4g} -> "
+                        f"{entry[metric]:.4g} (x{ratio:.2f})"
+                    )
+
+    return regressions
+
+
+def print_results(report: dict[str, Any]) -> None:
+    print(
+        f"{'solver':<12} {'size':>7} {'dens':>5} {'median':>10} {'p95':>10} "
+        f"{'peak KiB':>9} {'clauses':>8} {'fails':>5}"
+    )
+    for entry in report["results"]:
+        median = "-" if entry["median"] is None else f"{entry['median']:.5f}"
+        p95 = "-" if entry["p95"] is None else f"{entry['p95']:.5f}"
+        size = f"{entry['height']}x{entry['width']}"
+        print(
+            f"{entry['solver']:<12} {size:>7} {entry['density']:>5} {median:>10} "
+            f"{p95:>10} {entry['peak_memory'] / 1024:>9.1f} "
+            f"{entry.get('clauses', 0):>8.0f} {entry['timeouts'] + entry['errors']:>5}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m minesweeper.benchmark", description="Benchmark the solvers"
+    )
+    parser.add_argument(
+        "--solvers", default=",".join(SOLVERS), help="comma-separated names"
+    )
+    parser.add_argument(
+        "--sizes", default="9x9", help="comma-separated HEIGHTxWIDTH, e.g. 9x9,16x30"
+    )
+    parser.add_argument("--densities", default="0.15", help="comma-separated")
+    parser.add_argument("--boards", type=int, default=5)
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument(
+        "--compare", help="JSON file of a previous run, exit with 1 on regressions"
+    )
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = benchmark(
+        solvers=args.solvers.split(","),
+        sizes=[
+            (int(h), int(w))
+            for h, w in (size.split("x") for size in args.sizes.split(","))
+        ],
+        densities=[float(density) for density in args.densities.split(",")],
+        boards=args.boards,
+        trials=args.trials,
+        seed=args.seed,
+        timeout=args.timeout,
+    )
+    print_results(report)
+    for entry in report["results"]:
+        for message in entry["error_messages"]:
+            print(f"{entry['solver']} failed:", message, file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for regression in regressions:
+            print("Regression:", regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
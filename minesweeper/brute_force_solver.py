@@ -1,56 +1,61 @@
-from minesweeper._global import Field, FLAGGED_VAL
-from minesweeper.solver import KB, construct_CNF_clauses, combinations
-
-import copy
-import time
+from minesweeper._global import Field, Constraint
+from minesweeper.solver import CardinalityKB, Search, combinations, deduce_field
+from minesweeper.cache import ComponentCache
+from minesweeper.stats import SolveStats
+from minesweeper.budget import Budget, make_budget
+
+
+def brute_force_search(
+    kb: CardinalityKB,
+    init_model: dict[int, bool],
+    stats: SolveStats | None = None,
+    budget: Budget | None = None,
+) -> dict[int, bool] | None:
+    free_vars = [var for var in kb.vars if var not in init_model]
+
+    for i in range(len(free_vars) + 1):
+        for true_vars in combinations(free_vars, i):
+            model = {var: True if var in true_vars else False for var in free_vars}
+            model.update(init_model)
+            if stats is not None:
+                stats.nodes += 1
+            if budget is not None:
+                budget.tick()
+            if kb.is_satisfied(model):
+                return model
+
+    return None
 
 
 def brute_force_solve(
-    field: Field, check_field: bool = False, display_checking_time: bool = True
+    field: Field,
+    check_field: bool = False,
+    display_checking_time: bool = True,
+    cache: ComponentCache | None = None,
+    stats: SolveStats | None = None,
+    deadline: float | None = None,
+    max_nodes: int | None = None,
+    mark_safe: bool = False,
+    total_mines: int | None = None,
+    budget: Budget | None = None,
 ) -> Field:
-    clauses, vars_ = construct_CNF_clauses(field)
-    kb = KB(clauses, vars_)
-
-    # Check if the grid is valid (solvable) or not if required
-    if check_field:
-        start = 0
-        if display_checking_time:
-            start = time.process_time()
-
-        found_model = False
-        for i in range(1, len(vars_)):
-            for true_vars in combinations(vars_, i):
-                model = {var: True if var in true_vars else False for var in vars_}
-                if kb.is_satisfied(model):
-                    found_model = True
-                    break
-            if found_model:
-                break
-        if not found_model:
-            raise ValueError("Unsolvable grid")
-
-        if display_checking_time:
-            print("check: ", time.process_time() - start, "s")
-
-    # Finding solution
-    height = len(field)
-    width = len(field[0])
-
-    flagged_field = copy.deepcopy(field)
-    for var in vars_:
-        new_vars = [x for x in vars_ if x != var]
-
-        to_flag = True
-        for i in range(1, len(vars_)):
-            for true_vars in combinations(new_vars, i):
-                model = {var: True if var in true_vars else False for var in new_vars}
-                model[var] = False
-                if kb.is_satisfied(model):
-                    to_flag = False
-                    break
-            if not to_flag:
-                break
-        if to_flag:
-            flagged_field[(var - 1) // width][(var - 1) % width] = FLAGGED_VAL
-
-    return flagged_field
+    if budget is None:
+        budget = make_budget(deadline, max_nodes)
+
+    def create_search(constraints: list[Constraint], vars_: list[int]) -> Search:
+        kb = CardinalityKB(constraints, vars_)
+        if stats is not None:
+            stats.clauses += len(constraints)
+        return lambda assumptions: brute_force_search(kb, assumptions, stats, budget)
+
+    return deduce_field(
+        field,
+        create_search,
+        check_field,
+        display_checking_time,
+        cache,
+        stats,
+        budget,
+        mark_safe,
+        total_mines,
+    )
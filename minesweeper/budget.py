@@ -0,0 +1,74 @@
+import time
+from typing import Callable
+
+
+class BudgetExceeded(Exception):
+    """Raised by a search when its budget runs out
+
+    `find_backbone` fills in `partial` with the (mines, safe, undecided)
+    variables it had when the budget ran out, so that the work done so far is
+    not lost.
+    """
+
+    partial: tuple[list[int], list[int], list[int]] | None = None
+
+
+class Budget:
+    """Time and node budget shared by all the searches of one solve
+
+    It can also be cancelled from another thread, the searches then stop at
+    their next check as if the budget ran out.
+
+    Args:
+        deadline (float | None, optional): `time.monotonic()` value after which
+            the searches stop. Defaults to None.
+        max_nodes (int | None, optional): Number of nodes (models, nodes,
+            decisions or conflicts, depending on the engine) after which the
+            searches stop. Defaults to None.
+    """
+
+    def __init__(
+        self, deadline: float | None = None, max_nodes: int | None = None
+    ) -> None:
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.cancelled = False
+        # Called on `cancel`, to stop the native solvers running at that time
+        self.interrupts: list[Callable[[], None]] = []
+
+    def cancel(self) -> None:
+        """Stop the searches, can be called from any thread"""
+        self.cancelled = True
+        for interrupt in list(self.interrupts):
+            interrupt()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise BudgetExceeded("Cancelled")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise BudgetExceeded("Deadline reached")
+
+    def tick(self, nodes: int = 1) -> None:
+        """Count expanded nodes, raises BudgetExceeded when out of budget"""
+        self.nodes += nodes
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise BudgetExceeded(f"Node budget of {self.max_nodes} reached")
+        self.check()
+
+    def remaining_nodes(self) -> int | None:
+        if self.max_nodes is None:
+            return None
+        return max(0, self.max_nodes - self.nodes)
+
+    def remaining_time(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+
+def make_budget(deadline: float | None, max_nodes: int | None) -> Budget | None:
+    """Budget of a solve, None when it is unlimited"""
+    if deadline is None and max_nodes is None:
+        return None
+    return Budget(deadline, max_nodes)
@@ -0,0 +1,154 @@
+from minesweeper._global import Constraint
+
+import json
+import os
+from collections import OrderedDict
+
+# The 8 rotations and reflections of the grid, applied to (row, column)
+SYMMETRIES = [
+    lambda r, c: (r, c),
+    lambda r, c: (r, -c),
+    lambda r, c: (-r, c),
+    lambda r, c: (-r, -c),
+    lambda r, c: (c, r),
+    lambda r, c: (c, -r),
+    lambda r, c: (-c, r),
+    lambda r, c: (-c, -r),
+]
+
+CanonicalKey = tuple[tuple[tuple[int, ...], int, int], ...]
+
+
+def canonical_form(
+    constraints: list[Constraint], vars_: list[int], width: int
+) -> tuple[CanonicalKey, list[int]]:
+    """Canonical form of a component, the same for every translated, rotated,
+    reflected or relabelled copy of it
+
+    Under each symmetry of the grid, the variables are relabelled in the order
+    of their transformed positions, and the smallest resulting constraint list
+    is kept.
+
+    Args:
+        constraints (list[Constraint]): The constraints of the component
+        vars_ (list[int]): The variables of the component
+        width (int): Width of the field, to get the position of the variables
+
+    Returns:
+        tuple[CanonicalKey, list[int]]: the canonical constraints (over labels
+            0..n-1) and the variable of each label
+    """
+
+    best_key = None
+    best_vars: list[int] = []
+
+    for transform in SYMMETRIES:
+        position = {
+            var: transform((var - 1) // width, (var - 1) % width) for var in vars_
+        }
+        ordered = sorted(vars_, key=position.__getitem__)
+        label = {var: i for i, var in enumerate(ordered)}
+
+        key = tuple(
+            sorted(
+                (tuple(sorted(label[var] for var in cvars)), count, slack)
+                for cvars, count, slack in constraints
+            )
+        )
+        if best_key is None or key < best_key:
+            best_key = key
+            best_vars = ordered
+
+    assert best_key is not None
+    return best_key, best_vars
+
+
+class ComponentCache:
+    """LRU cache of the forced mines and safe cells of small components
+
+    Components are looked up by their canonical form, so the recurring frontier
+    patterns (1-2-1, corners, ...) are solved once, wherever they appear.
+    """
+
+    def __init__(
+        self, maxsize: int = 4096, max_vars: int = 16, path: str | None = None
+    ) -> None:
+        """
+        Args:
+            maxsize (int, optional): Number of components kept. Defaults to 4096.
+            max_vars (int, optional): Larger components are not cached, they
+                hardly ever come back. Defaults to 16.
+            path (str | None, optional): JSON file the cache is loaded from (if
+                it exists) and saved to. Defaults to None.
+        """
+        self.maxsize = maxsize
+        self.max_vars = max_vars
+        self.path = path
+        self.entries: OrderedDict[CanonicalKey, tuple[list[int], list[int]]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(
+        self, constraints: list[Constraint], vars_: list[int], width: int
+    ) -> tuple[list[int], list[int]] | None:
+        """Forced mines and safe cells of a component, None if not cached"""
+        if len(vars_) > self.max_vars:
+            return None
+
+        key, labelled = canonical_form(constraints, vars_, width)
+        if key not in self.entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        mines, safe = self.entries[key]
+        return [labelled[i] for i in mines], [labelled[i] for i in safe]
+
+    def store(
+        self,
+        constraints: list[Constraint],
+        vars_: list[int],
+        width: int,
+        mines: list[int],
+        safe: list[int],
+    ) -> None:
+        if len(vars_) > self.max_vars:
+            return
+
+        key, labelled = canonical_form(constraints, vars_, width)
+        label = {var: i for i, var in enumerate(labelled)}
+        self.entries[key] = (
+            sorted(label[var] for var in mines),
+            sorted(label[var] for var in safe),
+        )
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def load(self, path: str) -> None:
+        with open(path, "r") as f:
+            for key, mines, safe in json.load(f):
+                self.entries[tuple((tuple(cvars), *rest) for cvars, *rest in key)] = (
+                    mines,
+                    safe,
+                )
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def save(self, path: str | None = None) -> None:
+        """Write the cache (least recently used first) to a JSON file"""
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the cache to")
+
+        with open(path, "w") as f:
+            json.dump([[key, *value] for key, value in self.entries.items()], f)
@@ -0,0 +1,400 @@
+from minesweeper._global import Field, Clause, Constraint
+from minesweeper.solver import Search, deduce_field, encode_CNF
+from minesweeper.cache import ComponentCache
+from minesweeper.stats import SolveStats
+from minesweeper.budget import Budget, make_budget
+
+UNASSIGNED = -1
+
+
+# Decay of the activity of the learned clauses, after every conflict
+CLAUSE_DECAY = 0.999
+
+
+class DPLL:
+    """DPLL search with two-watched-literal unit propagation
+
+    Literals are encoded as `2 * idx` (positive) and `2 * idx + 1` (negative),
+    where `idx` is the position of the variable in `vars`, so their values can
+    be looked up in a flat assignment array. Assignments are recorded on a trail
+    and undone by popping it, instead of copying the model for every node.
+
+    With `learn`, the search is conflict driven (CDCL): every conflict is
+    analyzed down to its first unique implication point, the learned clause is
+    added to the clauses and the search jumps back to the level where it
+    becomes unit. The assumptions are decisions of their own levels, so the
+    learned clauses do not depend on them and are kept for the next calls of
+    `solve`. The least active half of the learned clauses is deleted when there
+    are too many of them.
+    """
+
+    def __init__(
+        self,
+        clauses: list[Clause],
+        vars_: list[int],
+        stats: SolveStats | None = None,
+        budget: Budget | None = None,
+        learn: bool = False,
+    ) -> None:
+        self.vars = vars_
+        self.stats = stats
+        self.budget = budget
+        self.learn = learn
+        self.idx_dict = {var: i for i, var in enumerate(vars_)}
+
+        self.assignment = [UNASSIGNED] * len(vars_)
+        self.trail: list[int] = []
+        self.qhead = 0
+        # Trail length at the start of each decision level
+        self.trail_lim: list[int] = []
+        # Clause that implied each variable (-1 for decisions) and its level
+        self.reason = [-1] * len(vars_)
+        self.level = [0] * len(vars_)
+        # Clause found falsified by the last failed `propagate`
+        self.conflict = -1
+
+        self.has_empty_clause = False
+        self.units: list[int] = []
+        self.clauses: list[list[int]] = []
+        self.watches: list[list[int]] = [[] for _ in range(2 * len(vars_))]
+
+        degree = [0] * len(vars_)
+        for clause in clauses:
+            lits = list({self.encode(lit) for lit in clause})
+            for lit in lits:
+                degree[lit >> 1] += 1
+
+            if not lits:
+                self.has_empty_clause = True
+            elif len(lits) == 1:
+                self.units.append(lits[0])
+            else:
+                # The first two literals of a clause are its watched literals
+                self.watches[lits[0]].append(len(self.clauses))
+                self.watches[lits[1]].append(len(self.clauses))
+                self.clauses.append(lits)
+
+        # Branch on the most constrained variables first
+        self.order = sorted(range(len(vars_)), key=lambda i: -degree[i])
+
+        # Learned clauses come after the original ones
+        self.num_original = len(self.clauses)
+        self.activity = [0.0] * len(self.clauses)
+        self.activity_inc = 1.0
+        self.max_learned = max(100, self.num_original // 2)
+
+    def encode(self, lit: int) -> int:
+        return 2 * self.idx_dict[abs(lit)] + (lit < 0)
+
+    def value(self, lit: int) -> int:
+        """Value of an encoded literal: 1 (true), 0 (false) or UNASSIGNED"""
+        val = self.assignment[lit >> 1]
+        if val == UNASSIGNED:
+            return UNASSIGNED
+        return val ^ (lit & 1)
+
+    def enqueue(self, lit: int, reason: int = -1) -> bool:
+        """Make an encoded literal true, returns False on conflict"""
+        val = self.value(lit)
+        if val != UNASSIGNED:
+            return val == 1
+
+        self.assignment[lit >> 1] = 1 - (lit & 1)
+        self.reason[lit >> 1] = reason
+        self.level[lit >> 1] = len(self.trail_lim)
+        self.trail.append(lit)
+        return True
+
+    def undo(self, trail_len: int) -> None:
+        """Unassign everything assigned after the trail had `trail_len` items"""
+        for lit in self.trail[trail_len:]:
+            self.assignment[lit >> 1] = UNASSIGNED
+        del self.trail[trail_len:]
+        self.qhead = min(self.qhead, trail_len)
+
+    def backjump(self, level: int) -> None:
+        """Undo the decision levels above `level`"""
+        if level < len(self.trail_lim):
+            self.undo(self.trail_lim[level])
+            del self.trail_lim[level:]
+
+    def propagate(self) -> bool:
+        """Unit propagation over the watched literals, returns False on conflict"""
+        while self.qhead < len(self.trail):
+            false_lit = self.trail[self.qhead] ^ 1
+            self.qhead += 1
+
+            watchers = self.watches[false_lit]
+            kept = []
+
+            for n, cid in enumerate(watchers):
+                clause = self.clauses[cid]
+                # Keep the falsified watched literal at position 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                if self.value(clause[0]) == 1:
+                    kept.append(cid)
+                    continue
+
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != 0:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(cid)
+                        break
+                else:
+                    kept.append(cid)
+                    if not self.enqueue(clause[0], cid):
+                        kept.extend(watchers[n + 1 :])
+                        self.watches[false_lit] = kept
+                        self.conflict = cid
+                        return False
+
+            self.watches[false_lit] = kept
+
+        return True
+
+    def search(self) -> bool:
+        """Complete the current assignment, returns False if it is impossible"""
+        # (trail length before the decision, decided literal, already flipped)
+        decisions: list[tuple[int, int, bool]] = []
+
+        while True:
+            if not self.propagate():
+                while decisions:
+                    trail_len, lit, flipped = decisions.pop()
+                    self.undo(trail_len)
+                    if not flipped:
+                        decisions.append((trail_len, lit ^ 1, True))
+                        self.enqueue(lit ^ 1)
+                        break
+                else:
+                    return False
+                continue
+
+            for i in self.order:
+                if self.assignment[i] == UNASSIGNED:
+                    break
+            else:
+                return True
+
+            if self.stats is not None:
+                self.stats.nodes += 1
+            if self.budget is not None:
+                self.budget.tick()
+
+            # Try "no mine" first, mines are the minority
+            decisions.append((len(self.trail), 2 * i + 1, False))
+            self.enqueue(2 * i + 1)
+
+    def bump(self, cid: int) -> None:
+        self.activity[cid] += self.activity_inc
+        if self.activity[cid] > 1e20:
+            self.activity = [activity * 1e-20 for activity in self.activity]
+            self.activity_inc *= 1e-20
+
+    def analyze(self, cid: int) -> tuple[list[int], int]:
+        """Learn a clause from the conflict of a clause
+
+        Resolves the conflicting clause with the reasons of its literals of the
+        current level, in reverse trail order, until only one of them is left
+        (the first unique implication point).
+
+        Returns:
+            tuple[list[int], int]: The learned clause, whose first literal is
+                the only one of the current level, and the level to jump back
+                to, where it becomes unit
+        """
+
+        current = len(self.trail_lim)
+        seen = [False] * len(self.vars)
+        learned = [-1]
+        pending = 0
+        lit = -1
+        index = len(self.trail) - 1
+
+        while True:
+            if cid >= self.num_original:
+                self.bump(cid)
+            for other in self.clauses[cid]:
+                var = other >> 1
+                # Literals of level 0 are implied by the clauses alone
+                if other == lit or seen[var] or self.level[var] == 0:
+                    continue
+                seen[var] = True
+                if self.level[var] == current:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Next literal of the current level to resolve on
+            while not seen[self.trail[index] >> 1]:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            cid = self.reason[lit >> 1]
+
+        learned[0] = lit ^ 1
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal of the highest other level, it is the last one to
+        # be unassigned
+        top = max(range(1, len(learned)), key=lambda k: self.level[learned[k] >> 1])
+        learned[1], learned[top] = learned[top], learned[1]
+        return learned, self.level[learned[1] >> 1]
+
+    def add_learned(self, clause: list[int]) -> int:
+        cid = len(self.clauses)
+        self.clauses.append(clause)
+        self.activity.append(0.0)
+        self.bump(cid)
+        self.watches[clause[0]].append(cid)
+        self.watches[clause[1]].append(cid)
+        return cid
+
+    def reduce_learned(self) -> None:
+        """Delete the least active half of the learned clauses (binary clauses
+        are kept), while nothing is assigned"""
+        learned = sorted(
+            (cid for cid in range(self.num_original, len(self.clauses))),
+            key=lambda cid: self.activity[cid],
+        )
+        deleted = {
+            cid for cid in learned[: len(learned) // 2] if len(self.clauses[cid]) > 2
+        }
+        kept = [cid for cid in range(len(self.clauses)) if cid not in deleted]
+        self.clauses = [self.clauses[cid] for cid in kept]
+        self.activity = [self.activity[cid] for cid in kept]
+
+        self.watches = [[] for _ in range(2 * len(self.vars))]
+        for cid, clause in enumerate(self.clauses):
+            self.watches[clause[0]].append(cid)
+            self.watches[clause[1]].append(cid)
+        self.max_learned = int(self.max_learned * 1.1)
+
+    def search_cdcl(self, assumptions: list[int]) -> bool:
+        """Complete the current assignment with clause learning, returns False
+        if it is impossible
+
+        Args:
+            assumptions (list[int]): Encoded literals, decided first
+        """
+
+        while True:
+            if not self.propagate():
+                # A conflict without decisions follows from the clauses alone
+                if not self.trail_lim:
+                    self.has_empty_clause = True
+                    return False
+
+                learned, level = self.analyze(self.conflict)
+                self.backjump(level)
+                if len(learned) == 1:
+                    self.units.append(learned[0])
+                    self.enqueue(learned[0])
+                else:
+                    self.enqueue(learned[0], self.add_learned(learned))
+                self.activity_inc /= CLAUSE_DECAY
+                continue
+
+            # Assumptions undone by a backjump are decided again
+            if len(self.trail_lim) < len(assumptions):
+                lit = assumptions[len(self.trail_lim)]
+                val = self.value(lit)
+                if val == 0:
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if val == UNASSIGNED:
+                    self.enqueue(lit)
+                continue
+
+            for i in self.order:
+                if self.assignment[i] == UNASSIGNED:
+                    break
+            else:
+                return True
+
+            if self.stats is not None:
+                self.stats.nodes += 1
+            if self.budget is not None:
+                self.budget.tick()
+
+            # Try "no mine" first, mines are the minority
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(2 * i + 1)
+
+    def reset(self) -> None:
+        self.undo(0)
+        self.trail_lim.clear()
+
+    def solve(self, assumptions: dict[int, bool]) -> dict[int, bool] | None:
+        """Find a model extending the assumptions
+
+        Args:
+            assumptions (dict[int, bool]): Values the model must have
+
+        Returns:
+            dict[int, bool] | None: The model found, None if there is none
+        """
+        self.reset()
+
+        if self.has_empty_clause:
+            return None
+        if self.learn and len(self.clauses) - self.num_original > self.max_learned:
+            self.reduce_learned()
+
+        for lit in self.units:
+            if not self.enqueue(lit):
+                return None
+
+        lits = [self.encode(var if val else -var) for var, val in assumptions.items()]
+        if self.learn:
+            found = self.search_cdcl(lits)
+        else:
+            found = all(self.enqueue(lit) for lit in lits) and self.search()
+        if not found:
+            self.reset()
+            return None
+
+        model = {var: self.assignment[i] == 1 for i, var in enumerate(self.vars)}
+        self.reset()
+        return model
+
+
+def dpll_solve(
+    field: Field,
+    check_field: bool = False,
+    display_checking_time: bool = True,
+    cache: ComponentCache | None = None,
+    stats: SolveStats | None = None,
+    deadline: float | None = None,
+    max_nodes: int | None = None,
+    mark_safe: bool = False,
+    total_mines: int | None = None,
+    cdcl: bool = False,
+    budget: Budget | None = None,
+) -> Field:
+    if budget is None:
+        budget = make_budget(deadline, max_nodes)
+
+    def create_search(constraints: list[Constraint], vars_: list[int]) -> Search:
+        clauses, cnf_vars = encode_CNF(constraints, vars_)
+        if stats is not None:
+            stats.clauses += len(clauses)
+        return DPLL(clauses, cnf_vars, stats, budget, learn=cdcl).solve
+
+    return deduce_field(
+        field,
+        create_search,
+        check_field,
+        display_checking_time,
+        cache,
+        stats,
+        budget,
+        mark_safe,
+        total_mines,
+    )
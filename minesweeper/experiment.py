@@ -1,23 +1,33 @@
-from minesweeper._global import Field, Answer, FLAGGED_VAL
-from minesweeper.solver import KB, construct_CNF_clauses
-from minesweeper.a_star_solver import Node
+from minesweeper._global import Field, Answer, Constraint
+from minesweeper.solver import (
+    KB,
+    CountKB,
+    Search,
+    deduce_field,
+    encode_CNF,
+    split_wide,
+)
+from minesweeper.a_star_solver import Node, check_explored
+from minesweeper.cache import ComponentCache
+from minesweeper.stats import SolveStats
+from minesweeper.budget import Budget, make_budget
 
 import heapq
-import copy
-import time
 from typing import Generator
 
 
-def is_satisfied(kb: KB, model: tuple[bool | None]) -> tuple[Answer, int]:
+def is_satisfied(kb: KB, model: tuple[int, int]) -> tuple[Answer, int]:
     """Check if a model (can be partial) satisfies all clauses
 
     Args:
-        model (tuple[bool  |  None]): _description_
+        model (tuple[int, int]): bitmasks of the assigned variables and of their
+            values, bit i is `kb.vars[i]`
 
     Returns:
         tuple[Answer, int]: _description_
     """
 
+    assigned, values = model
     count = 0
 
     for clause in kb.clauses:
@@ -25,14 +35,14 @@ def is_satisfied(kb: KB, model: tuple[bool | None]) -> tuple[Answer, int]:
         has_unassigned = False
 
         for var in clause:
-            val = model[kb.idx_dict[abs(var)]]
-            if val is not None:
+            i = kb.idx_dict[abs(var)]
+            if assigned >> i & 1:
                 if var > 0:
-                    if val:
+                    if values >> i & 1:
                         correct = True
                         break
                 else:
-                    if not val:
+                    if not values >> i & 1:
                         correct = True
                         break
             else:
@@ -50,88 +60,189 @@ def is_satisfied(kb: KB, model: tuple[bool | None]) -> tuple[Answer, int]:
     return Answer.UNKNOWN, count
 
 
-def gen_state(kb: KB, model: dict[int, bool]) -> tuple[bool | None]:
-    return tuple(model[var] if var in model else None for var in kb.vars)
+def gen_state(kb: KB, model: dict[int, bool]) -> tuple[int, int]:
+    """Bitmasks of the assigned variables of a model and of their values"""
+    assigned = 0
+    values = 0
+    for var, val in model.items():
+        assigned |= 1 << kb.idx_dict[var]
+        if val:
+            values |= 1 << kb.idx_dict[var]
+    return assigned, values
 
 
-def child_states(
-    parent_state: tuple[bool | None], exclude: int
-) -> Generator[tuple[bool | None], None, None]:
-    for i, val in enumerate(parent_state):
-        if i == exclude:
+def gen_model(kb: KB, state: tuple[int, int]) -> dict[int, bool]:
+    assigned, values = state
+    return {
+        var: bool(values >> i & 1) for i, var in enumerate(kb.vars) if assigned >> i & 1
+    }
+
+
+def assign_status(
+    kb: KB, state: tuple[int, int], h: int, idx: int, val: bool
+) -> tuple[Answer, int]:
+    """`is_satisfied` of a state after assigning one of its unassigned variables
+
+    Only the clauses containing the variable can change, so they are the only
+    ones visited. `h` is the number of undetermined clauses of the state.
+
+    Returns:
+        tuple[Answer, int]: same as `is_satisfied` for the child state
+    """
+
+    assigned, values = state
+    var = kb.vars[idx]
+    count = h
+
+    for cid in kb.occurrences[idx]:
+        correct = False
+        has_unassigned = False
+        lit_true = False
+
+        for lit in kb.clauses[cid]:
+            if abs(lit) == var:
+                if (lit > 0) == val:
+                    lit_true = True
+                continue
+
+            i = kb.idx_dict[abs(lit)]
+            if not assigned >> i & 1:
+                has_unassigned = True
+            elif (lit > 0) == bool(values >> i & 1):
+                correct = True
+                break
+
+        # Otherwise the clause was undetermined, since the variable was unassigned
+        if correct:
             continue
-        if val is not None:
+        if lit_true:
+            count -= 1
+        elif not has_unassigned:
+            return Answer.FALSE, -1
+
+    if count == 0:
+        return Answer.TRUE, count
+    return Answer.UNKNOWN, count
+
+
+def child_states(
+    parent_state: tuple[int, int], n: int
+) -> Generator[tuple[int, bool, tuple[int, int]], None, None]:
+    assigned, values = parent_state
+    for i in range(n):
+        if assigned >> i & 1:
             continue
 
+        bit = 1 << i
         for child_val in (True, False):
-            yield parent_state[:i] + (child_val,) + parent_state[i + 1 :]
-
+            yield i, child_val, (assigned | bit, values | bit if child_val else values)
 
-def a_star_search_inc(kb: KB, init_model: dict[int, bool], exclude: int = -1) -> bool:
-    l = len(kb.clauses)
 
+def a_star_search_inc(
+    kb: KB,
+    init_model: dict[int, bool],
+    max_explored: int | None = None,
+    stats: SolveStats | None = None,
+    budget: Budget | None = None,
+    counts: CountKB | None = None,
+) -> dict[int, bool] | None:
     state = gen_state(kb, init_model)
     ans, h = is_satisfied(kb, state)
     if ans == Answer.FALSE:
-        return False
+        return None
+    if counts is not None:
+        ans, count_h = counts.status(*state)
+        if ans == Answer.FALSE:
+            return None
+        h += count_h
     node = Node(state, h)
 
     frontier: list[Node] = []
     heapq.heappush(frontier, node)
-    explored: set[tuple[bool | None]] = set()
+    explored: set[tuple[int, int]] = set()
+
+    n = len(kb.vars)
 
     while True:
         if not frontier:
-            return False
+            return None
 
         node = heapq.heappop(frontier)
 
         if node.state in explored:
-            print(1, end="")
+            # print(1, end="")
             continue
 
         if node.h == 0:
-            return True
+            return gen_model(kb, node.state)
 
+        check_explored(explored, max_explored)
         explored.add(node.state)
+        if stats is not None:
+            stats.nodes += 1
+            stats.explored = max(stats.explored, len(explored))
+        if budget is not None:
+            budget.tick()
+
+        # Undetermined wide constraints of the node, part of its heuristic
+        node_count_h = 0 if counts is None else counts.status(*node.state)[1]
 
-        for child_state in child_states(node.state, exclude):
+        for i, val, child_state in child_states(node.state, n):
             if child_state in explored:
                 continue
 
-            ans, h = is_satisfied(kb, child_state)
+            ans, h = assign_status(kb, node.state, node.h - node_count_h, i, val)
             if ans == Answer.FALSE:
                 continue
+            if counts is not None:
+                ans, count_h = counts.status(*child_state)
+                if ans == Answer.FALSE:
+                    continue
+                h += count_h
 
             heapq.heappush(
                 frontier,
                 Node(child_state, h),
             )
+        if stats is not None:
+            stats.frontier_peak = max(stats.frontier_peak, len(frontier))
 
 
 def a_star_solve_inc(
-    field: Field, check_field: bool = False, display_checking_time: bool = True
+    field: Field,
+    check_field: bool = False,
+    display_checking_time: bool = True,
+    max_explored: int | None = None,
+    cache: ComponentCache | None = None,
+    stats: SolveStats | None = None,
+    deadline: float | None = None,
+    max_nodes: int | None = None,
+    mark_safe: bool = False,
+    total_mines: int | None = None,
+    budget: Budget | None = None,
 ) -> Field:
-    clauses, vars_ = construct_CNF_clauses(field)
-    kb = KB(clauses, vars_, create_idx_dict=True)
-
-    if check_field:
-        start = 0
-        if display_checking_time:
-            start = time.process_time()
-
-        if not a_star_search_inc(kb, {}):
-            raise ValueError("Unsolvable grid")
-
-        if display_checking_time:
-            print("check: ", time.process_time() - start, "s")
-
-    height = len(field)
-    width = len(field[0])
-
-    flagged_field = copy.deepcopy(field)
-    for i, var in enumerate(vars_):
-        if not a_star_search_inc(kb, {var: False}, i):
-            flagged_field[(var - 1) // width][(var - 1) % width] = FLAGGED_VAL
-
-    return flagged_field
+    if budget is None:
+        budget = make_budget(deadline, max_nodes)
+
+    def create_search(constraints: list[Constraint], vars_: list[int]) -> Search:
+        # The global mine count is counted on the states, not encoded
+        narrow, wide = split_wide(constraints)
+        kb = KB(*encode_CNF(narrow, vars_), create_idx_dict=True)
+        counts = CountKB(wide, kb.idx_dict) if wide else None
+        if stats is not None:
+            stats.clauses += len(kb.clauses) + len(wide)
+        return lambda assumptions: a_star_search_inc(
+            kb, assumptions, max_explored, stats, budget, counts
+        )
+
+    return deduce_field(
+        field,
+        create_search,
+        check_field,
+        display_checking_time,
+        cache,
+        stats,
+        budget,
+        mark_safe,
+        total_mines,
+    )
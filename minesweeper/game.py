@@ -0,0 +1,296 @@
+from minesweeper._global import Field, FLAGGED_VAL, UNOPENED_VAL, SAFE_VAL
+from minesweeper.probability import mine_probabilities
+from minesweeper.registry import SOLVERS, get_solver
+from minesweeper.session import SolverSession
+
+import argparse
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any
+
+
+class Board:
+    """Game of minesweeper with hidden mines
+
+    The mines are placed on the first `open`, away from the opened cell and its
+    neighbors (when there is room), so that the first click opens a region.
+
+    Args:
+        height (int): Number of rows
+        width (int): Number of columns
+        mines (int): Number of mines
+        seed (int | None, optional): Seed of the mine placement. Defaults to
+            None.
+    """
+
+    def __init__(
+        self, height: int, width: int, mines: int, seed: int | None = None
+    ) -> None:
+        if not 0 <= mines < height * width:
+            raise ValueError("Invalid number of mines")
+
+        self.height = height
+        self.width = width
+        self.mines = mines
+        self.rng = random.Random(seed)
+        # What the player sees
+        self.field: Field = [[UNOPENED_VAL] * width for _ in range(height)]
+        self.mine_cells: set[tuple[int, int]] = set()
+        self.numbers: list[list[int]] = []
+        self.opened = 0
+        self.lost = False
+
+    @property
+    def won(self) -> bool:
+        return not self.lost and self.opened == self.height * self.width - self.mines
+
+    @property
+    def over(self) -> bool:
+        return self.lost or self.won
+
+    def neighbors(self, i: int, j: int) -> list[tuple[int, int]]:
+        return [
+            (y, x)
+            for y in range(max(0, i - 1), min(self.height, i + 2))
+            for x in range(max(0, j - 1), min(self.width, j + 2))
+            if y != i or x != j
+        ]
+
+    def place_mines(self, i: int, j: int) -> None:
+        cells = [(y, x) for y in range(self.height) for x in range(self.width)]
+        excluded = {(i, j), *self.neighbors(i, j)}
+        candidates = [cell for cell in cells if cell not in excluded]
+        if len(candidates) < self.mines:
+            candidates = [cell for cell in cells if cell != (i, j)]
+
+        self.mine_cells = set(self.rng.sample(candidates, self.mines))
+        self.numbers = [
+            [
+                sum(cell in self.mine_cells for cell in self.neighbors(y, x))
+                for x in range(self.width)
+            ]
+            for y in range(self.height)
+        ]
+
+    def open(self, i: int, j: int) -> list[tuple[int, int, int]]:
+        """Open a cell, and flood open the neighbors of zeros
+
+        Opening a mine loses the game.
+
+        Returns:
+            list[tuple[int, int, int]]: (row, column, value) of the opened cells
+        """
+
+        if self.over or self.field[i][j] != UNOPENED_VAL:
+            return []
+        if not self.mine_cells:
+            self.place_mines(i, j)
+        if (i, j) in self.mine_cells:
+            self.lost = True
+            return []
+
+        opened = []
+        stack = [(i, j)]
+        while stack:
+            y, x = stack.pop()
+            if self.field[y][x] != UNOPENED_VAL:
+                continue
+            value = self.numbers[y][x]
+            self.field[y][x] = value
+            opened.append((y, x, value))
+            if value == 0:
+                stack.extend(self.neighbors(y, x))
+
+        self.opened += len(opened)
+        return opened
+
+    def flag(self, i: int, j: int) -> None:
+        if self.field[i][j] == UNOPENED_VAL:
+            self.field[i][j] = FLAGGED_VAL
+
+
+@dataclass
+class GameResult:
+    won: bool
+    # Cells clicked, guesses included (the opened zeros regions count once)
+    moves: int = 0
+    guesses: int = 0
+    time: float = 0.0
+
+
+def guess(board: Board) -> tuple[int, int]:
+    """Unopened cell least likely to be a mine, the first one on ties"""
+    probabilities = mine_probabilities(board.field, board.mines)
+    return min(
+        (
+            (i, j)
+            for i in range(board.height)
+            for j in range(board.width)
+            if board.field[i][j] == UNOPENED_VAL
+        ),
+        key=lambda cell: probabilities[cell[0]][cell[1]],
+    )
+
+
+def autoplay(
+    seed: int, width: int, height: int, mines: int, solver: str | None = None
+) -> GameResult:
+    """Play a whole game: open the safe cells while there are some, otherwise
+    open the cell with the lowest probability of being a mine
+
+    Args:
+        seed (int): Seed of the game
+        width (int): Number of columns
+        height (int): Number of rows
+        mines (int): Number of mines
+        solver (str | None, optional): Name of the solver (see `SOLVERS`) to
+            call on the whole field after every move. By default a
+            `SolverSession` is kept for the whole game and only told about the
+            new cells. Defaults to None.
+
+    Returns:
+        GameResult: Whether the game was won, and how
+    """
+
+    board = Board(height, width, mines, seed)
+    result = GameResult(won=False)
+    start = time.perf_counter()
+
+    # The first click can not be deduced, the middle is the most likely to open
+    # a large region
+    board.open(height // 2, width // 2)
+    result.moves += 1
+
+    # Both modes know the number of mines. The board's field is updated in
+    # place, so the solver always sees the current one.
+    session: SolverSession | None = None
+    if solver is None:
+        session = SolverSession(board.field, total_mines=mines)
+        deduce = partial(session.deduce, mark_safe=True)
+    else:
+        deduce = partial(
+            get_solver(solver),
+            board.field,
+            False,
+            False,
+            mark_safe=True,
+            total_mines=mines,
+        )
+
+    try:
+        while not board.over:
+            deduced = deduce()
+
+            safe = []
+            for i in range(height):
+                for j in range(width):
+                    if board.field[i][j] != UNOPENED_VAL:
+                        continue
+                    if deduced[i][j] == FLAGGED_VAL:
+                        board.flag(i, j)
+                        if session is not None:
+                            session.flag(i, j)
+                    elif deduced[i][j] == SAFE_VAL:
+                        safe.append((i, j))
+
+            if not safe:
+                safe = [guess(board)]
+                result.guesses += 1
+
+            for i, j in safe:
+                # Already opened by a zero of the same batch
+                if board.field[i][j] != UNOPENED_VAL:
+                    continue
+                opened = board.open(i, j)
+                result.moves += 1
+                if session is not None:
+                    session.open_cells(opened)
+    finally:
+        if session is not None:
+            session.delete()
+
+    result.won = board.won
+    result.time = time.perf_counter() - start
+    return result
+
+
+def play_many(
+    games: int,
+    width: int = 30,
+    height: int = 16,
+    mines: int = 99,
+    seed: int = 0,
+    solver: str | None = None,
+) -> dict[str, Any]:
+    """Play seeded games and measure the win rate and the throughput
+
+    Args:
+        games (int): Number of games, with the seeds `seed`, `seed + 1`, ...
+        width (int, optional): Number of columns. Defaults to 30.
+        height (int, optional): Number of rows. Defaults to 16.
+        mines (int, optional): Number of mines. Defaults to 99.
+        seed (int, optional): Seed of the first game. Defaults to 0.
+        solver (str | None, optional): See `autoplay`. Defaults to None.
+
+    Returns:
+        dict[str, Any]: The totals, `win_rate`, `moves_per_second`, and the
+            result of every game
+    """
+
+    results = [autoplay(seed + n, width, height, mines, solver) for n in range(games)]
+    wins = sum(result.won for result in results)
+    moves = sum(result.moves for result in results)
+    total_time = sum(result.time for result in results)
+    return {
+        "solver": solver or "session",
+        "games": games,
+        "width": width,
+        "height": height,
+        "mines": mines,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "moves": moves,
+        "guesses": sum(result.guesses for result in results),
+        "time": total_time,
+        "moves_per_second": moves / total_time if total_time else 0.0,
+        "results": [asdict(result) for result in results],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m minesweeper.game", description="Play seeded games"
+    )
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--size", default="16x30", help="HEIGHTxWIDTH")
+    parser.add_argument("--mines", type=int, default=99)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--solver",
+        choices=list(SOLVERS),
+        help="solve every move from scratch instead of keeping a session",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    height, width = (int(n) for n in args.size.split("x"))
+    report = play_many(args.games, width, height, args.mines, args.seed, args.solver)
+    print(
+        f"{report['solver']}: won {report['wins']}/{report['games']} "
+        f"({report['win_rate']:.1%}), {report['guesses']} guesses, "
+        f"{report['moves_per_second']:.1f} moves/s"
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
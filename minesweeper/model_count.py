@@ -0,0 +1,254 @@
+from minesweeper._global import Constraint
+
+from collections import Counter
+from math import comb
+
+# Number of models by number of mines (at index k), and for each variable, the
+# number of those models in which it is a mine
+Counts = tuple[list[int], dict[int, list[int]]]
+
+# Constraint over unassigned variables: (variables, at least, at most) mines
+Bounds = tuple[tuple[int, ...], int, int]
+
+
+def add(a: list[int], b: list[int]) -> list[int]:
+    if len(a) < len(b):
+        a, b = b, a
+    result = a.copy()
+    for i, x in enumerate(b):
+        result[i] += x
+    return result
+
+
+def convolve(a: list[int], b: list[int]) -> list[int]:
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+
+def combine(factors: list[Counts]) -> Counts:
+    """Counts of independent sets of variables, taken together
+
+    Each variable is combined with the product of the other factors, computed
+    from prefix and suffix products, so that it costs one convolution.
+    """
+
+    prefixes = [[1]]
+    for counts, _ in factors:
+        prefixes.append(convolve(prefixes[-1], counts))
+    suffixes = [[1]]
+    for counts, _ in reversed(factors):
+        suffixes.append(convolve(suffixes[-1], counts))
+    suffixes.reverse()
+
+    var_counts = {}
+    for i, (_, factor_var_counts) in enumerate(factors):
+        others = convolve(prefixes[i], suffixes[i + 1])
+        for var, mines in factor_var_counts.items():
+            var_counts[var] = convolve(mines, others)
+    return prefixes[-1], var_counts
+
+
+def simplify(
+    constraints: list[Bounds], assigned: dict[int, bool]
+) -> list[Bounds] | None:
+    """Apply the assignment and decide the variables it forces, until nothing
+    changes
+
+    Args:
+        constraints (list[Bounds]): The constraints
+        assigned (dict[int, bool]): Assignment, completed with the forced
+            variables
+
+    Returns:
+        list[Bounds] | None: The constraints that are not satisfied yet, over
+            their unassigned variables, None on contradiction
+    """
+
+    changed = True
+    while changed:
+        changed = False
+        remaining = []
+        for vars_, low, high in constraints:
+            free = []
+            for var in vars_:
+                if var not in assigned:
+                    free.append(var)
+                elif assigned[var]:
+                    low -= 1
+                    high -= 1
+
+            if high < 0 or low > len(free):
+                return None
+            if high == 0 or low == len(free):
+                for var in free:
+                    assigned[var] = low > 0
+                changed = changed or bool(free)
+            elif low > 0 or high < len(free):
+                remaining.append((tuple(free), max(low, 0), min(high, len(free))))
+        constraints = remaining
+
+    return constraints
+
+
+def split(constraints: list[Bounds]) -> list[list[Bounds]]:
+    """Group constraints sharing variables (union-find over the variables)"""
+    parent: dict[int, int] = {}
+
+    def find(var: int) -> int:
+        while parent[var] != var:
+            parent[var] = parent[parent[var]]
+            var = parent[var]
+        return var
+
+    for vars_, _, _ in constraints:
+        for var in vars_:
+            parent.setdefault(var, var)
+        root = find(vars_[0])
+        for var in vars_[1:]:
+            parent[find(var)] = root
+
+    groups: dict[int, list[Bounds]] = {}
+    for constraint in constraints:
+        groups.setdefault(find(constraint[0][0]), []).append(constraint)
+    return list(groups.values())
+
+
+def branch_variable(constraints: list[Bounds], occurrences: Counter) -> int:
+    """Variable to branch on: a most constrained one near the middle of the
+    component
+
+    Frontiers are long chains of constraints, assigning a cell in their middle
+    splits them in two halves instead of peeling off one end. The middle is
+    taken on a longest shortest path between two variables, found with two
+    breadth-first searches.
+    """
+
+    neighbors: dict[int, set[int]] = {var: set() for var in occurrences}
+    for cvars, _, _ in constraints:
+        for var in cvars:
+            neighbors[var].update(cvars)
+
+    def farthest(start: int) -> tuple[int, dict[int, int | None]]:
+        parents: dict[int, int | None] = {start: None}
+        queue = [start]
+        for var in queue:
+            for other in neighbors[var]:
+                if other not in parents:
+                    parents[other] = var
+                    queue.append(other)
+        return queue[-1], parents
+
+    end, _ = farthest(min(occurrences))
+    other_end, parents = farthest(end)
+    path = [other_end]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+
+    middle = path[max(0, len(path) // 2 - 1) : len(path) // 2 + 2]
+    return max(middle, key=lambda var: occurrences[var])
+
+
+class ModelCounter:
+    """Exact model counter over cardinality constraints (#SAT)
+
+    Forced variables are decided first, then the constraints are split into
+    independent components, counted separately and combined by convolution
+    (dynamic decomposition, as variables get assigned components keep falling
+    apart). A component is counted by branching on a variable of its middle
+    (see `branch_variable`), and the counts of every component met are cached, so the same
+    sub-problem reached through different branches is only counted once.
+
+    The cache is kept across calls of `count`.
+    """
+
+    def __init__(self) -> None:
+        self.cache: dict[tuple[Bounds, ...], Counts] = {}
+
+    def count(
+        self,
+        constraints: list[Constraint],
+        vars_: list[int],
+        assigned: dict[int, bool] | None = None,
+    ) -> Counts:
+        """Count the models of the constraints, grouped by their number of mines
+
+        Args:
+            constraints (list[Constraint]): The constraints, between
+                `count - slack` and `count` mines
+            vars_ (list[int]): The variables, those in no constraint are free
+            assigned (dict[int, bool] | None, optional): Values some variables
+                must have. Defaults to None.
+
+        Returns:
+            Counts: Number of models using k mines, at index k, and for each
+                variable, the number of those in which it is a mine
+        """
+
+        bounds = [
+            (tuple(cvars), count - slack, count) for cvars, count, slack in constraints
+        ]
+        return self.count_bounds(bounds, vars_, dict(assigned or {}))
+
+    def count_bounds(
+        self, constraints: list[Bounds], vars_: list[int], assigned: dict[int, bool]
+    ) -> Counts:
+        remaining = simplify(constraints, assigned)
+        if remaining is None:
+            return [0], {var: [0] for var in vars_}
+
+        factors = [self.count_component(component) for component in split(remaining)]
+
+        # The variables in no constraint left are one more factor: `forced` of
+        # them are mines, and the `len(free)` unassigned ones are free
+        constrained = {var for cvars, _, _ in remaining for var in cvars}
+        free = [var for var in vars_ if var not in constrained and var not in assigned]
+        forced = sum(
+            1 for var in vars_ if var not in constrained and assigned.get(var, False)
+        )
+        binomials = [comb(len(free), k) for k in range(len(free) + 1)]
+        counts = [0] * forced + binomials
+        var_counts = {}
+        for var in vars_:
+            if var in constrained:
+                continue
+            if var not in assigned:
+                # Mine in the models of the other free variables, times x
+                var_counts[var] = [0] * (forced + 1) + [
+                    comb(len(free) - 1, k) for k in range(len(free))
+                ]
+            else:
+                var_counts[var] = counts if assigned[var] else [0]
+        factors.append((counts, var_counts))
+
+        return combine(factors)
+
+    def count_component(self, constraints: list[Bounds]) -> Counts:
+        key = tuple(
+            sorted(
+                (tuple(sorted(cvars)), low, high) for cvars, low, high in constraints
+            )
+        )
+        if key in self.cache:
+            return self.cache[key]
+
+        occurrences = Counter(var for cvars, _, _ in key for var in cvars)
+        vars_ = sorted(occurrences)
+        branch = branch_variable(list(key), occurrences)
+
+        counts_0, var_counts_0 = self.count_bounds(list(key), vars_, {branch: False})
+        counts_1, var_counts_1 = self.count_bounds(list(key), vars_, {branch: True})
+        result = add(counts_0, counts_1), {
+            var: add(var_counts_0[var], var_counts_1[var]) for var in vars_
+        }
+
+        self.cache[key] = result
+        return result
+
+
+def count_models(constraints: list[Constraint], vars_: list[int]) -> Counts:
+    """Count the models of constraints (see `ModelCounter.count`)"""
+    return ModelCounter().count(constraints, vars_)
@@ -0,0 +1,153 @@
+from minesweeper._global import Answer, Clause
+from minesweeper.solver import KB
+
+import numpy as np
+from typing import Sequence
+
+# Values of a variable in a model vector
+TRUE = 1
+FALSE = 0
+UNASSIGNED = -1
+
+
+class NumpyKB(KB):
+    """Knowledge base evaluated with NumPy array operations
+
+    The clauses are packed into a padded literal matrix: `lits[c, k]` is the
+    index (in `vars`) of the k-th variable of clause c and `signs[c, k]` tells if
+    it is positive. Padding points to an extra slot of the model vector which
+    is always FALSE behind a positive sign, so it never satisfies a clause.
+
+    The matrix is built from `idx_dict`, which is made in any case.
+    `create_idx_dict` adds the occurrence index, as in `KB`, which only
+    `flip_delta` uses.
+    """
+
+    def __init__(
+        self,
+        from_clauses: list[Clause] | None = None,
+        vars_: list[int] | None = None,
+        create_idx_dict: bool = False,
+    ) -> None:
+        super().__init__(from_clauses, vars_)
+        self.with_occurrences = create_idx_dict
+        self.pack()
+
+    def pack(self) -> None:
+        self.idx_dict = {var: i for i, var in enumerate(self.vars)}
+        if self.with_occurrences:
+            self.create_occurrences()
+        pad = len(self.vars)
+        width = max((len(clause) for clause in self.clauses), default=0)
+
+        self.lits = np.full((len(self.clauses), width), pad, dtype=np.intp)
+        self.signs = np.ones((len(self.clauses), width), dtype=bool)
+        for c, clause in enumerate(self.clauses):
+            self.lits[c, : len(clause)] = [self.idx_dict[abs(lit)] for lit in clause]
+            self.signs[c, : len(clause)] = [lit > 0 for lit in clause]
+
+    def add_clause(self, clause: list[int]) -> None:
+        super().add_clause(clause)
+        self.vars = list(dict.fromkeys(self.vars))
+        self.pack()
+
+    def add_clauses(self, clauses: list[list[int]]) -> None:
+        super().add_clauses(clauses)
+        self.vars = list(dict.fromkeys(self.vars))
+        self.pack()
+
+    def model_vector(self, model: dict[int, bool]) -> np.ndarray:
+        """Convert a (partial) model to a vector of TRUE/FALSE/UNASSIGNED"""
+        vector = np.full(len(self.vars) + 1, UNASSIGNED, dtype=np.int8)
+        vector[-1] = FALSE
+        for var, val in model.items():
+            vector[self.idx_dict[var]] = TRUE if val else FALSE
+        return vector
+
+    def true_literals(self, vectors: np.ndarray) -> np.ndarray:
+        values = vectors[..., self.lits]
+        return np.where(self.signs, values == TRUE, values == FALSE)
+
+    def is_satisfied(self, model: dict[int, bool]) -> bool:
+        """Check if a model (can be partial) satisfies all clauses
+
+        Args:
+            model (dict[int, bool]): The model to check
+
+        Returns:
+            bool: True if the model satisfies all clauses, False otherwise
+        """
+        return bool(self.true_literals(self.model_vector(model)).any(axis=1).all())
+
+    def is_satisfied_extended(self, model: dict[int, bool]) -> tuple[Answer, int]:
+        """Check if a model (can be partial) satisfies all clauses (extended version)
+
+        Args:
+            model (dict[int, bool]): The model to check
+
+        Returns:
+            tuple[Answer, int]:
+                - Answer: can be TRUE, FALSE, or UNKNOWN (when there are
+                  undetermined clauses).
+                - int: number of undetermined clauses (0 for TRUE, -1 for FALSE)
+        """
+        vector = self.model_vector(model)
+        satisfied = self.true_literals(vector).any(axis=1)
+        has_unassigned = (vector[self.lits] == UNASSIGNED).any(axis=1)
+
+        if (~satisfied & ~has_unassigned).any():
+            return Answer.FALSE, -1
+
+        count = int((~satisfied).sum())
+        if count == 0:
+            return Answer.TRUE, count
+        return Answer.UNKNOWN, count
+
+    def num_false_clauses(self, model: int) -> int:
+        """Count the number of false clauses
+
+        Args:
+            model (int): The model to apply, as a bitmask where bit i is the
+                value of `vars[i]`
+
+        Returns:
+            int: number of clauses that are false
+        """
+        return int(self.num_false_clauses_batch([model])[0])
+
+    def num_false_clauses_batch(self, models: Sequence[int]) -> np.ndarray:
+        """Count the number of false clauses of many models at once
+
+        Args:
+            models (Sequence[int]): The models to apply, as bitmasks
+
+        Returns:
+            np.ndarray: number of clauses that are false, for each model
+        """
+        # Unpack the bitmasks into one row of TRUE/FALSE per model
+        n = len(self.vars)
+        n_bytes = (n + 7) // 8
+        data = b"".join(model.to_bytes(n_bytes, "little") for model in models)
+        bits = np.frombuffer(data, dtype=np.uint8).reshape(len(models), n_bytes)
+
+        vectors = np.zeros((len(models), n + 1), dtype=np.int8)
+        vectors[:, :-1] = np.unpackbits(bits, axis=1, bitorder="little")[:, :n]
+        satisfied = self.true_literals(vectors).any(axis=2)
+        return (~satisfied).sum(axis=1)
+
+    def flip_deltas(self, model: int, idxs: list[int]) -> np.ndarray:
+        """Change of `num_false_clauses` when each of the given variables of the
+        model is flipped, computed as one batch
+
+        Args:
+            model (int): The model to apply, as a bitmask
+            idxs (list[int]): Indices of the variables to flip (one at a time)
+
+        Returns:
+            np.ndarray: number of false clauses of each flipped model, minus the
+                one of the model
+        """
+        counts = self.num_false_clauses_batch(
+            [model ^ (1 << idx) for idx in idxs] + [model]
+        )
+        return counts[:-1] - counts[-1]
@@ -0,0 +1,104 @@
+from minesweeper._global import Field, FLAGGED_VAL, UNOPENED_VAL
+from minesweeper.model_count import ModelCounter, combine
+from minesweeper.solver import construct_constraints, split_components
+
+from math import comb
+
+
+def mine_probabilities(
+    field: Field, total_mines: int | None = None
+) -> list[list[float | None]]:
+    """Compute the exact probability that each unopened cell holds a mine
+
+    Every solution of the field is equally likely. Components of the frontier
+    are counted on their own (with `ModelCounter`, so large frontiers do not
+    need to be enumerated) and only combined through their number of mines,
+    which is weighted by the ways to place the remaining mines in the unopened
+    cells next to no number.
+
+    Args:
+        field (Field): The field to analyze
+        total_mines (int | None, optional): Number of mines of the whole board
+            (flags included). Without it, cells next to no number can not be
+            estimated. Defaults to None.
+
+    Returns:
+        list[list[float | None]]: Probability of each cell. Flagged cells are 1,
+            opened cells (and unknown cells) are None.
+    """
+
+    height = len(field)
+    width = len(field[0])
+
+    constraints, vars_ = construct_constraints(field)
+    counter = ModelCounter()
+    components = [
+        counter.count(comp_constraints, comp_vars)
+        for comp_constraints, comp_vars in split_components(constraints, vars_)
+    ]
+
+    frontier = set(vars_)
+    interior = []
+    flagged = 0
+    for i in range(height):
+        for j in range(width):
+            if field[i][j] == FLAGGED_VAL:
+                flagged += 1
+            elif field[i][j] == UNOPENED_VAL and i * width + j + 1 not in frontier:
+                interior.append(i * width + j + 1)
+
+    probabilities: dict[int, float | None] = {}
+
+    if total_mines is None:
+        for counts, var_counts in components:
+            total = sum(counts)
+            if total == 0:
+                raise ValueError("Unsolvable grid")
+            for var, mine_counts in var_counts.items():
+                probabilities[var] = sum(mine_counts) / total
+
+        for var in interior:
+            probabilities[var] = None
+    else:
+        remaining = total_mines - flagged
+
+        def weight(mines: int) -> int:
+            # Ways to place the other mines in the interior
+            if 0 <= remaining - mines <= len(interior):
+                return comb(len(interior), remaining - mines)
+            return 0
+
+        # Counts of the whole frontier, each component with the product of the
+        # others taken from prefix and suffix products, linear in their number
+        distribution, var_counts = combine(components)
+
+        total = sum(count * weight(k) for k, count in enumerate(distribution))
+        if total == 0:
+            raise ValueError("Unsolvable grid")
+
+        for var, mine_counts in var_counts.items():
+            mine_weight = 0
+            for s, count in enumerate(mine_counts):
+                mine_weight += count * weight(s)
+            probabilities[var] = mine_weight / total
+
+        if interior:
+            interior_weight = 0
+            for k, count in enumerate(distribution):
+                interior_weight += count * weight(k) * (remaining - k)
+            for var in interior:
+                probabilities[var] = interior_weight / (len(interior) * total)
+
+    result: list[list[float | None]] = []
+    for i in range(height):
+        row = []
+        for j in range(width):
+            if field[i][j] == FLAGGED_VAL:
+                row.append(1.0)
+            elif field[i][j] == UNOPENED_VAL:
+                row.append(probabilities[i * width + j + 1])
+            else:
+                row.append(None)
+        result.append(row)
+
+    return result
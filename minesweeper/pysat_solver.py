@@ -1,37 +1,267 @@
-from minesweeper._global import Field, FLAGGED_VAL
-from minesweeper.solver import construct_CNF_clauses
+from minesweeper._global import Field, Clause, Constraint
+from minesweeper.solver import Search, deduce_field
+from minesweeper.cache import ComponentCache
+from minesweeper.stats import SolveStats
+from minesweeper.budget import Budget, BudgetExceeded, make_budget
 
+import threading
 import pysat.solvers
-import copy
-import time
+from pysat.card import CardEnc, EncType
+from pysat.formula import IDPool
+
+
+def solver_classes(*prefixes: str) -> tuple[type, ...]:
+    return tuple(
+        cls
+        for name, cls in vars(pysat.solvers).items()
+        if name.startswith(prefixes) and isinstance(cls, type)
+    )
+
+
+# Backends PySAT can not interrupt, they only stop between two calls
+UNINTERRUPTIBLE_SOLVERS = solver_classes("Cadical", "Kissat", "Lingeling")
+# Backends with no limited solve at all, not even a conflict budget
+UNLIMITED_SOLVERS = solver_classes("Lingeling")
+
+
+def accum_stats(solver: pysat.solvers.Solver) -> dict[str, int]:
+    """Statistics of a solver, empty for the backends that do not expose them"""
+    try:
+        return solver.accum_stats() or {}
+    except NotImplementedError:
+        return {}
+
+
+def solve_limited(
+    solver: pysat.solvers.Solver, assumptions: list[int], budget: Budget
+) -> bool:
+    """`solver.solve` within a budget, where the nodes are conflicts
+
+    The deadline is enforced by interrupting the solver from a timer thread, and
+    cancelling the budget interrupts it too. Backends without a limited solve
+    (Lingeling) run a plain `solve`, the budget is then only checked between
+    two calls. The limits may be raised while the solver runs (`SolveService`
+    merges the budgets of coalesced requests), the call then goes on with the
+    new ones.
+
+    Raises:
+        BudgetExceeded: if the solver stopped before finding an answer
+    """
+
+    budget.check()
+    limited = not isinstance(solver.solver, UNLIMITED_SOLVERS)
+    interrupt = not isinstance(solver.solver, UNINTERRUPTIBLE_SOLVERS)
+    conflicts = accum_stats(solver).get("conflicts", 0)
+
+    while True:
+        limits = (budget.deadline, budget.max_nodes)
+        remaining_nodes = budget.remaining_nodes()
+        if remaining_nodes is not None and limited:
+            solver.conf_budget(remaining_nodes)
+
+        remaining_time = budget.remaining_time()
+        timer = None
+        if interrupt:
+            budget.interrupts.append(solver.interrupt)
+            if remaining_time is not None:
+                timer = threading.Timer(remaining_time, solver.interrupt)
+                timer.start()
+
+        try:
+            # In case it was cancelled before the interrupt was registered
+            budget.check()
+            if limited:
+                result = solver.solve_limited(
+                    assumptions=assumptions, expect_interrupt=interrupt
+                )
+            else:
+                result = solver.solve(assumptions=assumptions)
+        finally:
+            if interrupt:
+                budget.interrupts.remove(solver.interrupt)
+                if timer is not None:
+                    timer.cancel()
+                solver.clear_interrupt()
+
+        used = accum_stats(solver).get("conflicts", 0) - conflicts
+        conflicts += used
+        if result is not None:
+            budget.tick(used)
+            return result
+
+        # Stopped by its budget, go on only if the limits were raised meanwhile
+        budget.nodes += used
+        if (budget.deadline, budget.max_nodes) == limits:
+            raise BudgetExceeded("Solver stopped by its budget")
+        budget.check()
+        if budget.max_nodes is None and limited:
+            solver.conf_budget(-1)  # No conflict limit anymore
+
+
+def pysat_search(
+    solver: pysat.solvers.Solver,
+    vars_: list[int],
+    assumptions: dict[int, bool],
+    budget: Budget | None = None,
+) -> dict[int, bool] | None:
+    lits = [var if val else -var for var, val in assumptions.items()]
+    if budget is None:
+        sat = solver.solve(assumptions=lits)
+    else:
+        sat = solve_limited(solver, lits, budget)
+    if not sat:
+        return None
+
+    model = set(solver.get_model())
+    return {var: var in model for var in vars_}
+
+
+def decisions(solver: pysat.solvers.Solver) -> int:
+    return accum_stats(solver).get("decisions", 0)
+
+
+DEFAULT_BACKEND = "minisat22"
+AUTO_BACKEND = "auto"
+
+
+def is_backend(backend: str, *prefixes: str) -> bool:
+    """Whether a backend name belongs to one of the solver families"""
+    return any(
+        backend in names
+        for attr, names in vars(pysat.solvers.SolverNames).items()
+        if attr.startswith(prefixes)
+    )
+
+
+def interruptible(backend: str) -> bool:
+    """Whether a backend can be stopped at a deadline, PySAT can not interrupt
+    CaDiCaL, Kissat or Lingeling"""
+    return not is_backend(backend, "cadical", "kissat", "lingeling")
+
+
+def select_backend(clauses: int, vars_: int, deadline: bool = False) -> str:
+    """Backend for a component of this size
+
+    Timed on the components left by `propagate` on random and expert fields:
+    MiniSat is the fastest below about 800 clauses (or 110 cells), where
+    building the solver and the many small calls dominate, CaDiCaL 1.5.3 is
+    about 1.5 times faster above. Glucose 3 comes next, and replaces it when
+    there is a deadline.
+    """
+    if clauses >= 800 or vars_ >= 110:
+        return "glucose3" if deadline else "cadical153"
+    return "minisat22"
+
+
+def encode_constraints(constraints: list[Constraint], vpool: IDPool) -> list[Clause]:
+    """Encode cardinality constraints with sequential counters
+
+    Args:
+        constraints (list[Constraint]): The constraints to encode
+        vpool (IDPool): Pool of auxiliary variables, which must start after the
+            last cell variable
+
+    Returns:
+        list[Clause]: The encoded clauses
+    """
+
+    clauses = []
+
+    for vars_, count, slack in constraints:
+        if count < 0 or count - slack > len(vars_):
+            clauses.append([])
+            continue
+
+        if slack == 0:
+            clauses.extend(
+                CardEnc.equals(
+                    lits=vars_, bound=count, vpool=vpool, encoding=EncType.seqcounter
+                ).clauses
+            )
+            continue
+
+        if count < len(vars_):
+            clauses.extend(
+                CardEnc.atmost(
+                    lits=vars_, bound=count, vpool=vpool, encoding=EncType.seqcounter
+                ).clauses
+            )
+        if count - slack > 0:
+            clauses.extend(
+                CardEnc.atleast(
+                    lits=vars_,
+                    bound=count - slack,
+                    vpool=vpool,
+                    encoding=EncType.seqcounter,
+                ).clauses
+            )
+
+    return clauses
 
 
 def pysat_solve(
-    field: Field, check_field: bool = False, display_checking_time: bool = True
+    field: Field,
+    check_field: bool = False,
+    display_checking_time: bool = True,
+    cache: ComponentCache | None = None,
+    stats: SolveStats | None = None,
+    deadline: float | None = None,
+    max_nodes: int | None = None,
+    mark_safe: bool = False,
+    total_mines: int | None = None,
+    backend: str = DEFAULT_BACKEND,
+    budget: Budget | None = None,
 ) -> Field:
-    clauses, vars_ = construct_CNF_clauses(field)
-    solver = pysat.solvers.Solver(bootstrap_with=clauses)
+    """Flag the forced mines of a field with PySAT solvers
 
-    # Check if the grid is valid (solvable) or not if required
-    if check_field:
-        start = 0
-        if display_checking_time:
-            start = time.process_time()
+    Args:
+        backend (str, optional): Name of the PySAT solver (see
+            `pysat.solvers.SolverNames`), or "auto" to pick one for each
+            component with `select_backend`. Defaults to "minisat22".
+        budget (Budget | None, optional): Budget to use instead of one made
+            from `deadline` and `max_nodes`, e.g. to cancel the solve from
+            another thread. Defaults to None.
 
-        if not solver.solve():
-            raise ValueError("Unsolvable grid")
+    The other arguments are the ones of `deduce_field`.
+    """
 
-        if display_checking_time:
-            print("check: ", time.process_time() - start, "s")
+    if budget is None:
+        budget = make_budget(deadline, max_nodes)
+    has_deadline = budget is not None and budget.deadline is not None
+    if has_deadline and backend != AUTO_BACKEND and not interruptible(backend):
+        raise ValueError(f"The {backend} backend does not support deadlines")
+    # PySAT ignores the assumptions given to Kissat, every query would succeed
+    if is_backend(backend, "kissat"):
+        raise ValueError(f"The {backend} backend does not support assumptions")
+    vpool = IDPool(start_from=len(field) * len(field[0]) + 1)
+    solvers: list[pysat.solvers.Solver] = []
 
-    # Finding process
-    height = len(field)
-    width = len(field[0])
+    def create_search(constraints: list[Constraint], vars_: list[int]) -> Search:
+        clauses = encode_constraints(constraints, vpool)
+        if stats is not None:
+            stats.clauses += len(clauses)
+        name = backend
+        if backend == AUTO_BACKEND:
+            name = select_backend(len(clauses), len(vars_), has_deadline)
 
-    flagged_field = copy.deepcopy(field)
-    for var in vars_:
-        if not solver.solve(assumptions=[-var]):
-            flagged_field[(var - 1) // width][(var - 1) % width] = FLAGGED_VAL
+        solver = pysat.solvers.Solver(name=name, bootstrap_with=clauses)
+        solvers.append(solver)
+        return lambda assumptions: pysat_search(solver, vars_, assumptions, budget)
 
-    solver.delete()
-    return flagged_field
+    try:
+        return deduce_field(
+            field,
+            create_search,
+            check_field,
+            display_checking_time,
+            cache,
+            stats,
+            budget,
+            mark_safe,
+            total_mines,
+        )
+    finally:
+        for solver in solvers:
+            if stats is not None:
+                stats.nodes += decisions(solver)
+            solver.delete()
@@ -0,0 +1,25 @@
+from minesweeper._global import Field
+from minesweeper.brute_force_solver import brute_force_solve
+from minesweeper.backtracking_solver import backtracking_solve
+from minesweeper.a_star_solver import a_star_solve
+from minesweeper.experiment import a_star_solve_inc
+from minesweeper.pysat_solver import pysat_solve
+from minesweeper.dpll_solver import dpll_solve
+
+from typing import Callable
+
+# Every *_solve entry point, by the name used to select it
+SOLVERS: dict[str, Callable[..., Field]] = {
+    "brute_force": brute_force_solve,
+    "backtracking": backtracking_solve,
+    "a_star": a_star_solve,
+    "a_star_inc": a_star_solve_inc,
+    "pysat": pysat_solve,
+    "dpll": dpll_solve,
+}
+
+
+def get_solver(name: str) -> Callable[..., Field]:
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver: {name}")
+    return SOLVERS[name]
@@ -0,0 +1,211 @@
+from minesweeper._global import Field
+from minesweeper.budget import Budget
+from minesweeper.registry import get_solver
+from minesweeper.stats import SolveStats
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+
+@dataclass
+class Job:
+    """Solve in flight, shared by every caller asking for the same board"""
+
+    future: asyncio.Future
+    budget: Budget
+    stats: SolveStats
+    waiters: int = 0
+
+
+def merge_limit(a: float | None, b: float | None) -> float | None:
+    """Limit covering two requests, where None is unlimited"""
+    if a is None or b is None:
+        return None
+    return max(a, b)
+
+
+class SolveService:
+    """Runs the blocking solvers on a thread pool for asyncio code
+
+    Identical requests (same field and solver arguments) made while one is in
+    flight are coalesced: they wait for the same solve. At most `max_pending`
+    solves are queued or running, further requests wait for a slot
+    (backpressure).
+
+    Every solve gets its own `Budget`. The limits of coalesced requests are
+    merged: the solve runs until the latest `deadline` and for the largest
+    `max_nodes`, without a limit as soon as one of them has none. Each caller
+    giving `stats` gets the statistics of the shared solve added to them.
+    When all the callers waiting for a solve are cancelled, the budget is
+    cancelled, which stops the search at its next check and interrupts the
+    PySAT solver running at that time.
+
+    Args:
+        solver (str, optional): Name of the solver (see `SOLVERS`). Defaults to
+            "pysat".
+        workers (int | None, optional): Number of threads. Defaults to the
+            number of CPUs.
+        max_pending (int, optional): Number of solves queued or running at the
+            same time. Defaults to 64.
+        **kwargs: Passed to the solver, e.g. `mark_safe`
+    """
+
+    def __init__(
+        self,
+        solver: str = "pysat",
+        workers: int | None = None,
+        max_pending: int = 64,
+        **kwargs: Any,
+    ) -> None:
+        self.solve = get_solver(solver)
+        self.kwargs = kwargs
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            thread_name_prefix="minesweeper-solve",
+        )
+        # asyncio objects belong to one event loop, they are made by the first
+        # request of each loop
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.slots: asyncio.Semaphore | None = None
+        self.jobs: dict[Hashable, Job] = {}
+
+    async def solve_async(self, field: Field, **kwargs: Any) -> Field:
+        """Solve a field without blocking the event loop
+
+        Args:
+            field (Field): The field, it is copied before the call returns
+            **kwargs: Passed to the solver, on top of those of the service.
+                `deadline` and `max_nodes` make the budget of the solve. A
+                caller giving its own `budget` is not coalesced, the budget is
+                cancelled when the caller is.
+
+        Returns:
+            Field: The solution, shared with the coalesced callers
+
+        Raises:
+            asyncio.CancelledError: when the caller is cancelled, the solve is
+                stopped unless other callers still wait for it
+        """
+
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            self.slots = asyncio.Semaphore(self.max_pending)
+            self.jobs = {}
+
+        kwargs = {**self.kwargs, **kwargs}
+        # Arguments of the caller, not of the solve
+        deadline = kwargs.pop("deadline", None)
+        max_nodes = kwargs.pop("max_nodes", None)
+        stats = kwargs.pop("stats", None)
+        budget = kwargs.pop("budget", None)
+
+        key: Hashable = object()
+        if budget is None:
+            key = (
+                tuple(tuple(row) for row in field),
+                tuple(sorted((name, repr(value)) for name, value in kwargs.items())),
+            )
+        job = self.jobs.get(key)
+        if job is None:
+            # Copied before waiting for a slot, the caller may change it
+            job = await self.submit(
+                key,
+                [list(row) for row in field],
+                kwargs,
+                budget or Budget(deadline, max_nodes),
+            )
+        if budget is None:
+            # Read by the search as it runs, raising them lets it go on
+            job.budget.deadline = merge_limit(job.budget.deadline, deadline)
+            job.budget.max_nodes = merge_limit(job.budget.max_nodes, max_nodes)
+
+        job.waiters += 1
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            job.waiters -= 1
+            if job.waiters == 0 and not job.future.done():
+                job.budget.cancel()
+                if self.jobs.get(key) is job:
+                    del self.jobs[key]
+            raise
+        finally:
+            if stats is not None and job.future.done():
+                stats.add(job.stats)
+
+    async def submit(
+        self, key: Hashable, field: Field, kwargs: dict[str, Any], budget: Budget
+    ) -> Job:
+        assert self.slots is not None and self.loop is not None
+        await self.slots.acquire()
+
+        # Another caller may have submitted the same field while this one waited
+        job = self.jobs.get(key)
+        if job is not None:
+            self.slots.release()
+            return job
+
+        stats = SolveStats()
+        future = self.loop.run_in_executor(
+            self.executor,
+            lambda: self.solve(field, budget=budget, stats=stats, **kwargs),
+        )
+        job = Job(future, budget, stats)
+        self.jobs[key] = job
+
+        slots = self.slots
+
+        def finished(future: asyncio.Future) -> None:
+            slots.release()
+            if self.jobs.get(key) is job:
+                del self.jobs[key]
+            # Nobody may be waiting for it anymore
+            if not future.cancelled():
+                future.exception()
+
+        future.add_done_callback(finished)
+        return job
+
+    async def close(self) -> None:
+        """Cancel the solves in flight and wait for the threads to stop"""
+        for job in self.jobs.values():
+            job.budget.cancel()
+        self.jobs = {}
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+
+# Made by the first call of `solve_async` without a service, by solver name
+_default_services: dict[str, SolveService] = {}
+
+
+async def solve_async(
+    field: Field,
+    solver: str = "pysat",
+    service: SolveService | None = None,
+    **kwargs: Any,
+) -> Field:
+    """Solve a field on a thread pool, see `SolveService`
+
+    Args:
+        field (Field): The field
+        solver (str, optional): Name of the solver (see `SOLVERS`), used when
+            no service is given. Defaults to "pysat".
+        service (SolveService | None, optional): The service to use. Defaults
+            to a service shared by the calls without one, with one per solver
+            name.
+        **kwargs: Passed to the solver
+
+    Returns:
+        Field: The solution
+    """
+
+    if service is None:
+        if solver not in _default_services:
+            _default_services[solver] = SolveService(solver)
+        service = _default_services[solver]
+    return await service.solve_async(field, **kwargs)
@@ -0,0 +1,420 @@
+from minesweeper._global import (
+    Field,
+    Constraint,
+    FLAGGED_VAL,
+    UNOPENED_VAL,
+    SAFE_VAL,
+)
+from minesweeper.array_field import ArrayField, neighbor_table
+from minesweeper.solver import (
+    find_backbone,
+    mine_count_constraint,
+    propagate,
+    to_CNF_clauses,
+)
+from minesweeper.pysat_solver import encode_constraints
+
+import pysat.solvers
+from pysat.formula import IDPool
+import copy
+from typing import Iterable
+
+
+class SolverSession:
+    """PySAT solver kept alive across the moves of one game
+
+    Every cell has a variable (`y * width + x + 1`, as in `construct_constraints`).
+    Opened and flagged cells are added as unit clauses and each number adds its
+    constraint once, expanded into plain clauses (`to_CNF_clauses`) since it has
+    at most 8 cells. When every neighbor of a number is decided, the unit
+    clauses satisfy its clauses and the solver drops them, so the constraint is
+    only retired from the bookkeeping. Activation literals would cost an
+    assumption per active constraint in every call, and encoding them with
+    auxiliary variables cost more than the expansion.
+
+    Constraints are only encoded when the solver is first needed after they
+    were added, and `deduce` runs `propagate` first, so the solver only sees the
+    cells that single constraints or pairs of them do not decide.
+
+    The constraints over the unopened cells and the frontier are updated with
+    each move, and the cells `deduce` decides stay decided. So `deduce` only
+    propagates the constraints touched since the previous call, and only asks
+    the solver about the cells of the components those constraints belong to.
+
+    With `total_mines`, the total number of mines is a constraint as in
+    `deduce_field`. When it can change the answers, it is added for one
+    `deduce` behind its own activation literal, and every frontier cell is
+    searched, since it connects them all.
+
+    Args:
+        field (Field | ArrayField): The field at the start of the game
+        total_mines (int | None, optional): Number of mines of the whole board
+            (flags included). Defaults to None.
+    """
+
+    def __init__(
+        self, field: Field | ArrayField, total_mines: int | None = None
+    ) -> None:
+        if isinstance(field, ArrayField):
+            self.field = field.to_field()
+        else:
+            self.field = copy.deepcopy(field)
+        self.height = len(field)
+        self.width = len(field[0])
+        self.total_mines = total_mines
+        # Flagged and unopened cells, for the total number of mines
+        self.flags = 0
+        self.unopened = 0
+        self.neighbor_cells = [
+            [(index // self.width, index % self.width) for index in indices]
+            for indices in neighbor_table(self.height, self.width)
+        ]
+
+        self.vpool = IDPool(start_from=self.height * self.width + 1)
+        self.solver = pysat.solvers.Solver()
+        # Active constraints not given to the solver yet
+        self.pending: set[tuple[int, int]] = set()
+        # Active constraints over the unopened cells, and the active constraints
+        # each unopened cell is in (its keys are the frontier)
+        self.constraints: dict[tuple[int, int], Constraint] = {}
+        self.occurrences: dict[int, set[tuple[int, int]]] = {}
+        # Constraints changed since the last propagation, and since the last
+        # backbone search
+        self.dirty: set[tuple[int, int]] = set()
+        self.touched: set[tuple[int, int]] = set()
+        # Frontier cells decided by `deduce`, mine or safe
+        self.known: dict[int, bool] = {}
+        # Frontier cells the backbone search left undecided, with whether safe
+        # cells were looked for
+        self.free: dict[int, bool] = {}
+
+        for i in range(self.height):
+            for j in range(self.width):
+                if self.field[i][j] == FLAGGED_VAL:
+                    self.solver.add_clause([self.var(i, j)])
+                    self.flags += 1
+                elif self.field[i][j] == UNOPENED_VAL:
+                    self.unopened += 1
+                else:
+                    self.solver.add_clause([-self.var(i, j)])
+                    self.add_constraint(i, j)
+
+    def __enter__(self) -> "SolverSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.delete()
+
+    def delete(self) -> None:
+        self.solver.delete()
+
+    def var(self, i: int, j: int) -> int:
+        return i * self.width + j + 1
+
+    def neighbors(self, i: int, j: int) -> list[tuple[int, int]]:
+        return self.neighbor_cells[i * self.width + j]
+
+    def is_decided(self, i: int, j: int) -> bool:
+        return all(self.field[y][x] != UNOPENED_VAL for y, x in self.neighbors(i, j))
+
+    def constraint(self, i: int, j: int) -> Constraint:
+        """Constraint of a number over its unopened neighbors"""
+        cells = []
+        count = self.field[i][j]
+        for y, x in self.neighbors(i, j):
+            if self.field[y][x] == FLAGGED_VAL:
+                count -= 1
+            elif self.field[y][x] == UNOPENED_VAL:
+                cells.append(self.var(y, x))
+        return Constraint(cells, count)
+
+    def add_constraint(self, i: int, j: int) -> None:
+        # Zeros are kept too, they prove their neighbors safe
+        if self.is_decided(i, j):
+            return
+
+        # Encoded on the next search, most constraints are retired before
+        self.pending.add((i, j))
+
+        constraint = self.constraint(i, j)
+        self.constraints[(i, j)] = constraint
+        for var in constraint.vars:
+            self.occurrences.setdefault(var, set()).add((i, j))
+        self.dirty.add((i, j))
+        self.touched.add((i, j))
+
+    def encode_pending(self) -> None:
+        for key in self.pending:
+            # Over the cells still unopened, the others are fixed by unit clauses
+            for clause in to_CNF_clauses([self.constraints[key]]):
+                self.solver.add_clause(clause)
+        self.pending.clear()
+
+    def cell_decided(self, i: int, j: int) -> None:
+        """Remove a cell that was opened or flagged from the constraints over
+        it, and retire those left with no cell"""
+        var = self.var(i, j)
+        mine = self.field[i][j] == FLAGGED_VAL
+        self.known.pop(var, None)
+        self.free.pop(var, None)
+
+        for key in self.occurrences.pop(var, ()):
+            cvars, count, slack = self.constraints[key]
+            cvars = [other for other in cvars if other != var]
+            self.constraints[key] = Constraint(cvars, count - mine, slack)
+            self.dirty.add(key)
+            self.touched.add(key)
+            if not cvars:
+                self.retire_constraint(key)
+
+    def retire_constraint(self, key: tuple[int, int]) -> None:
+        """Retire an active constraint whose neighbors are all decided"""
+        del self.constraints[key]
+        self.dirty.discard(key)
+        self.touched.discard(key)
+        self.pending.discard(key)
+
+    def open_cell(self, i: int, j: int, value: int) -> None:
+        """Record that a cell was opened and shows `value`"""
+        self.open_cells([(i, j, value)])
+
+    def open_cells(self, cells: Iterable[tuple[int, int, int]]) -> None:
+        """Record that cells were opened, as (row, column, value)
+
+        The constraints are added once every cell is recorded, so that a region
+        opened by a zero only adds the constraints of its border.
+        """
+        opened = []
+        for i, j, value in cells:
+            if self.field[i][j] != UNOPENED_VAL:
+                continue
+            self.field[i][j] = value
+            self.solver.add_clause([-self.var(i, j)])
+            self.unopened -= 1
+            opened.append((i, j))
+
+        for i, j in opened:
+            self.cell_decided(i, j)
+        for i, j in opened:
+            self.add_constraint(i, j)
+
+    def flag(self, i: int, j: int) -> None:
+        """Record that a cell holds a mine"""
+        if self.field[i][j] != UNOPENED_VAL:
+            return
+
+        self.field[i][j] = FLAGGED_VAL
+        self.solver.add_clause([self.var(i, j)])
+        self.flags += 1
+        self.unopened -= 1
+        self.cell_decided(i, j)
+
+    def frontier(self) -> list[int]:
+        """Variables of the unopened cells next to an active constraint"""
+        return list(self.occurrences)
+
+    def search(
+        self, assumptions: dict[int, bool], guards: list[int] | None = None
+    ) -> dict[int, bool] | None:
+        """Search a model of the active constraints, and of the constraints
+        activated by `guards` (see `guard`)"""
+        self.encode_pending()
+        cells = [var if val else -var for var, val in assumptions.items()]
+        if not self.solver.solve(assumptions=(guards or []) + cells):
+            return None
+
+        # The model is sorted by variable, only the frontier cells are read
+        model = self.solver.get_model()
+        return {var: model[var - 1] > 0 for var in self.occurrences}
+
+    def guard(self, constraint: Constraint) -> int:
+        """Add a constraint that only holds when its activation literal, which
+        is returned, is assumed"""
+        act = self.vpool.id()
+        for clause in encode_constraints([constraint], self.vpool):
+            self.solver.add_clause(clause + [-act])
+        return act
+
+    def satisfiable(self, constraint: Constraint) -> bool:
+        """Whether the active constraints allow one more, which is then
+        retired"""
+        act = self.guard(constraint)
+        model = self.search({}, [act])
+        self.solver.add_clause([-act])
+        return model is not None
+
+    def reduced(self, key: tuple[int, int]) -> Constraint:
+        """Active constraint over the cells `deduce` did not decide"""
+        cvars, count, slack = self.constraints[key]
+        rest = [var for var in cvars if var not in self.known]
+        count -= sum(self.known.get(var, False) for var in cvars)
+        return Constraint(rest, count, slack)
+
+    def decide(self, vars_: list[int], value: bool) -> None:
+        for var in vars_:
+            if var not in self.known:
+                self.known[var] = value
+                self.dirty.update(self.occurrences[var])
+
+    def propagate_dirty(self) -> None:
+        """`propagate` the changed constraints and the ones sharing a cell with
+        them (the pairs the subset rule needs), until nothing is decided"""
+        while self.dirty:
+            keys = set(self.dirty)
+            for key in self.dirty:
+                for var in self.constraints[key].vars:
+                    keys.update(self.occurrences[var])
+            self.dirty.clear()
+
+            constraints = [self.reduced(key) for key in keys]
+            vars_ = list({var for cvars, _, _ in constraints for var in cvars})
+
+            mines, safe, _, _ = propagate(constraints, vars_)
+            self.decide(mines, True)
+            self.decide(safe, False)
+
+    def touched_vars(self) -> set[int]:
+        """Cells of the components of the constraints touched since the last
+        backbone search, the only ones its answers can change for"""
+        keys = set(self.touched)
+        stack = list(self.touched)
+        reached: set[int] = set()
+        while stack:
+            for var in self.constraints[stack.pop()].vars:
+                if var in reached:
+                    continue
+                reached.add(var)
+                for key in self.occurrences[var] - keys:
+                    keys.add(key)
+                    stack.append(key)
+        self.touched.clear()
+        return reached
+
+    def deduce(self, mark_safe: bool = False) -> Field:
+        """Flag the forced mines of the current field
+
+        Args:
+            mark_safe (bool, optional): Also mark the cells that can not be a
+                mine, with the same solver. Defaults to False.
+
+        Returns:
+            Field: The current field, with forced mines set to `FLAGGED_VAL`
+                (and safe cells to `SAFE_VAL` if `mark_safe`)
+        """
+        # Most cells are decided by single constraints or pairs of them, the
+        # solver is only asked about the others
+        self.propagate_dirty()
+
+        for var in self.touched_vars():
+            self.free.pop(var, None)
+
+        if self.total_mines is None or not self.deduce_count(mark_safe):
+            self.deduce_components(mark_safe)
+
+        flagged_field = [row[:] for row in self.field]
+        for var, mine in self.known.items():
+            if mine:
+                value = FLAGGED_VAL
+            elif mark_safe:
+                value = SAFE_VAL
+            else:
+                continue
+            flagged_field[(var - 1) // self.width][(var - 1) % self.width] = value
+
+        return flagged_field
+
+    def deduce_count(self, mark_safe: bool) -> bool:
+        """Decide the cells that the total number of mines forces, like
+        `deduce_field` does
+
+        Returns:
+            bool: Whether the global constraint was needed. Otherwise nothing
+                was searched, and the frontier is left to the usual search.
+        """
+        assert self.total_mines is not None
+
+        vars_ = [var for var in self.occurrences if var not in self.known]
+        # Unopened cells next to no number, not decided yet
+        interior = (
+            self.unopened
+            - len(self.occurrences)
+            - sum(var not in self.occurrences for var in self.known)
+        )
+        remaining = self.total_mines - self.flags - sum(self.known.values())
+
+        # Same test as `mine_count_constraint` with the loosest bounds, between
+        # no mine and all the frontier, before building the components
+        margin = 1 if interior else 0
+        low, high = 0, len(vars_)
+        if (
+            vars_
+            and low >= remaining - interior + margin
+            and high <= remaining - margin
+        ):
+            return False
+
+        constraints = [self.reduced(key) for key in self.constraints]
+        constraints = [constraint for constraint in constraints if constraint.vars]
+        count_constraint = mine_count_constraint(
+            constraints, vars_, remaining, interior
+        )
+        if count_constraint is None and vars_:
+            return False
+
+        if count_constraint is not None:
+            act = self.guard(count_constraint)
+            backbone_mines, backbone_safe = find_backbone(
+                vars_,
+                lambda assumptions: self.search(assumptions, [act]),
+                find_safe=mark_safe,
+            )
+            self.solver.add_clause([-act])
+            self.known.update((var, True) for var in backbone_mines)
+            self.known.update((var, False) for var in backbone_safe)
+
+        # The interior is all mines or all safe when the frontier always leaves
+        # all or none of the remaining mines to it
+        if interior:
+            if vars_:
+                can_be_mine = self.satisfiable(
+                    Constraint(vars_, remaining - 1, interior - 1)
+                )
+                can_be_safe = self.satisfiable(
+                    Constraint(vars_, remaining, interior - 1)
+                )
+            else:
+                can_be_mine = 1 <= remaining <= interior
+                can_be_safe = 0 <= remaining < interior
+            if not can_be_mine or not can_be_safe:
+                cells = [
+                    self.var(i, j)
+                    for i in range(self.height)
+                    for j in range(self.width)
+                    if self.field[i][j] == UNOPENED_VAL
+                ]
+                self.known.update(
+                    (var, not can_be_safe)
+                    for var in cells
+                    if var not in self.occurrences and var not in self.known
+                )
+
+        return True
+
+    def deduce_components(self, mark_safe: bool) -> None:
+        """Search the frontier cells of the components touched since the last
+        search"""
+        vars_ = [
+            var
+            for var in self.occurrences
+            if var not in self.known
+            and (var not in self.free or mark_safe and not self.free[var])
+        ]
+        backbone_mines, backbone_safe = find_backbone(
+            vars_, self.search, find_safe=mark_safe
+        )
+        # Decided without being propagated, the backbone is already complete
+        self.known.update((var, True) for var in backbone_mines)
+        self.known.update((var, False) for var in backbone_safe)
+        for var in vars_:
+            if var not in self.known:
+                self.free[var] = mark_safe
@@ -1,6 +1,28 @@
-from minesweeper._global import Field, Answer, Clause, FLAGGED_VAL, UNOPENED_VAL
+from minesweeper._global import (
+    Field,
+    Answer,
+    Clause,
+    Constraint,
+    FLAGGED_VAL,
+    UNOPENED_VAL,
+    SAFE_VAL,
+    UNKNOWN_VAL,
+)
+from minesweeper.array_field import ArrayField, neighbor_table
+from minesweeper.budget import Budget, BudgetExceeded
+from minesweeper.cache import ComponentCache
+from minesweeper.stats import SolveStats
 
-from typing import Iterable, Generator
+import time
+from typing import Callable, Iterable, Generator, Sequence, TypeAlias, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # The constraints are then extracted cell by cell
+    np = None
+
+# Finds a model (can be partial) extending the given assumptions, or None
+Search: TypeAlias = Callable[[dict[int, bool]], dict[int, bool] | None]
 
 
 def combinations(iterable: Iterable, r: int) -> Generator[tuple, None, None]:
@@ -28,55 +50,751 @@ def combinations(iterable: Iterable, r: int) -> Generator[tuple, None, None]:
         yield tuple(pool[i] for i in indices)
 
 
-def construct_CNF_clauses(field: Field) -> tuple[list[Clause], list[int]]:
-    height = len(field)
-    width = len(field[0])
+# Number of cells from which construct_constraints uses NumPy, when installed
+VECTORIZE_MIN_CELLS = 2500
+
+
+def construct_constraints(
+    field: Field | ArrayField,
+) -> tuple[list[Constraint], list[int]]:
+    board = field if isinstance(field, ArrayField) else ArrayField.from_field(field)
+    if np is not None and len(board.cells) >= VECTORIZE_MIN_CELLS:
+        return construct_constraints_vectorized(board)
+
+    cells = board.cells
+    constraints = []
+    vars_ = set()
+
+    # Add a constraint for each opened cell.
+    for index, neighbor_indices in enumerate(neighbor_table(board.height, board.width)):
+        value = cells[index]
+        # We only care about "opened" cells, since only them can provide information
+        # to create constraints.
+        # We also ignore "opened cell" that is 0, because in the minesweeper game,
+        # every cell around it has already been opened by default.
+        # Flagged, unopened, safe and unknown cells are all negative.
+        if value <= 0:
+            continue
+
+        surrounded_mines = value
+        neighbors = []
+        for neighbor in neighbor_indices:
+            neighbor_value = cells[neighbor]
+            if neighbor_value == FLAGGED_VAL:
+                surrounded_mines -= 1
+            elif neighbor_value == UNOPENED_VAL:
+                # Flat indices start from 0, variables from 1
+                neighbors.append(neighbor + 1)
+
+        # A cell whose neighbors are all decided says nothing, unless it
+        # contradicts its flags
+        if not neighbors and surrounded_mines == 0:
+            continue
+
+        vars_.update(neighbors)
+        constraints.append(Constraint(neighbors, surrounded_mines))
+
+    return constraints, list(vars_)
+
+
+def at_most_clauses(lits: list[int], k: int, next_aux: int) -> tuple[list[Clause], int]:
+    """Sequential counter encoding of "at most k of lits are true"
+
+    Auxiliary variable `s(i, j)` is true when at least j of the first i + 1
+    literals are true, which takes O(n * k) clauses instead of the C(n, k + 1)
+    of the plain expansion.
+
+    Args:
+        lits (list[int]): The literals
+        k (int): Maximum number of true literals
+        next_aux (int): First free variable, for the auxiliary variables
+
+    Returns:
+        tuple[list[Clause], int]: the clauses and the next free variable
+    """
+
+    n = len(lits)
+    if k < 0:
+        return [[]], next_aux
+    if k >= n:
+        return [], next_aux
+    if k == 0:
+        return [[-lit] for lit in lits], next_aux
+
+    def s(i: int, j: int) -> int:
+        return next_aux + i * k + (j - 1)
+
+    clauses = [[-lits[0], s(0, 1)]]
+    clauses.extend([-s(0, j)] for j in range(2, k + 1))
+    for i in range(1, n - 1):
+        clauses.append([-lits[i], s(i, 1)])
+        clauses.append([-s(i - 1, 1), s(i, 1)])
+        for j in range(2, k + 1):
+            clauses.append([-lits[i], -s(i - 1, j - 1), s(i, j)])
+            clauses.append([-s(i - 1, j), s(i, j)])
+        clauses.append([-lits[i], -s(i - 1, k)])
+    clauses.append([-lits[n - 1], -s(n - 2, k)])
+
+    return clauses, next_aux + (n - 1) * k
+
+
+# Constraints over more variables than a single cell are not expanded into
+# every combination
+MAX_EXPANDED_VARS = 8
+
+
+def to_CNF_clauses(
+    constraints: list[Constraint], next_aux: int | None = None
+) -> list[Clause]:
+    """Expand cardinality constraints into plain CNF clauses
+
+    Constraints of a single cell (at most `MAX_EXPANDED_VARS` variables) are
+    expanded into every combination. Wider ones, like the global mine count, use sequential counters
+    with auxiliary variables.
+
+    Args:
+        constraints (list[Constraint]): The constraints to expand
+        next_aux (int | None, optional): First auxiliary variable. Defaults to
+            the variable after the largest one of the constraints.
+
+    Returns:
+        list[Clause]: The equivalent clauses
+    """
+
     clauses = []
+    if next_aux is None:
+        next_aux = max((max(c.vars, default=0) for c in constraints), default=0) + 1
+
+    for neighbors, surrounded_mines, slack in constraints:
+        at_least = surrounded_mines - slack
+
+        if len(neighbors) > MAX_EXPANDED_VARS:
+            at_most, next_aux = at_most_clauses(neighbors, surrounded_mines, next_aux)
+            clauses.extend(at_most)
+            at_least_clauses, next_aux = at_most_clauses(
+                [-x for x in neighbors], len(neighbors) - at_least, next_aux
+            )
+            clauses.extend(at_least_clauses)
+            continue
+
+        # Encode "at most" constraint as CNF clauses
+        for c in combinations(neighbors, surrounded_mines + 1):
+            clauses.append([-x for x in c])
+
+        # Encode "at least" constraint as CNF clauses
+        for c in combinations(neighbors, len(neighbors) - at_least + 1):
+            clauses.append([x for x in c])
+
+    return clauses
+
+
+def encode_CNF(
+    constraints: list[Constraint], vars_: list[int]
+) -> tuple[list[Clause], list[int]]:
+    """`to_CNF_clauses`, with the variables of the clauses: `vars_` followed by
+    the auxiliary variables"""
+    clauses = to_CNF_clauses(constraints)
+    known = set(vars_)
+    aux = sorted({abs(lit) for clause in clauses for lit in clause} - known)
+    return clauses, vars_ + aux
+
+
+def construct_constraints_vectorized(
+    board: ArrayField,
+) -> tuple[list[Constraint], list[int]]:
+    """NumPy version of `construct_constraints`, with the same output
+
+    The 8 neighbors of every cell are compared at once by shifting the
+    (padded) board, one shift per neighbor in row major order, so that the
+    variables of each constraint come out in the same order.
+    """
+
+    height, width = board.height, board.width
+    cells = np.frombuffer(board.cells, dtype=np.int8).reshape(height, width)
+    unopened = np.pad(cells == UNOPENED_VAL, 1)
+    flagged = np.pad(cells == FLAGGED_VAL, 1)
+
+    offsets = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+    # (height, width, 8) masks of the unopened and flagged neighbors
+    unopened_neighbors = np.stack(
+        [
+            unopened[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width]
+            for dy, dx in offsets
+        ],
+        axis=-1,
+    )
+    flagged_neighbors = np.stack(
+        [
+            flagged[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width]
+            for dy, dx in offsets
+        ],
+        axis=-1,
+    )
+    counts = cells.astype(np.int16) - np.count_nonzero(flagged_neighbors, axis=-1)
+
+    # Same filters as construct_constraints: only numbers, and only those with an
+    # unopened neighbor or a contradiction with their flags
+    keep = (cells > 0) & (unopened_neighbors.any(axis=-1) | (counts != 0))
+    ys, xs = np.nonzero(keep)
+    masks = unopened_neighbors[ys, xs]
+    neighbor_vars = (ys * width + xs + 1)[:, None] + np.array(
+        [dy * width + dx for dy, dx in offsets]
+    )
+    sizes = np.count_nonzero(masks, axis=1)
+    groups = np.split(neighbor_vars[masks], np.cumsum(sizes)[:-1])
+
+    constraints = [
+        Constraint(group.tolist(), count)
+        for group, count in zip(groups, counts[ys, xs].tolist())
+    ]
     vars_ = set()
+    for constraint in constraints:
+        vars_.update(constraint.vars)
+
+    return constraints, list(vars_)
+
+
+def construct_CNF_clauses(field: Field) -> tuple[list[Clause], list[int]]:
+    constraints, vars_ = construct_constraints(field)
+    return to_CNF_clauses(constraints), vars_
+
+
+T = TypeVar("T", Clause, Constraint)
+
+
+def constraint_vars(item: Clause | Constraint) -> list[int]:
+    """Variables of a clause or a constraint"""
+    if isinstance(item, Constraint):
+        return item.vars
+    return [abs(lit) for lit in item]
+
+
+def is_trivially_false(item: Clause | Constraint) -> bool:
+    """Check if a clause or a constraint can not be satisfied by any model"""
+    if isinstance(item, Constraint):
+        return item.count < 0 or item.count - item.slack > len(item.vars)
+    return not item
+
+
+def split_components(
+    clauses: list[T], vars_: list[int]
+) -> list[tuple[list[T], list[int]]]:
+    """Partition clauses (or constraints) and variables into independent
+    connected components
+
+    Two variables are connected when they appear in the same clause, so the
+    components share no variables and each one can be solved on its own.
+
+    Args:
+        clauses (list[T]): The clauses or constraints to partition
+        vars_ (list[int]): The variables appearing in the clauses
+
+    Returns:
+        list[tuple[list[T], list[int]]]: (clauses, vars) of each component
+    """
+
+    # An unsatisfiable clause makes the whole field unsatisfiable, keep it in one
+    # piece so that every solver still reports it the same way.
+    if any(is_trivially_false(clause) for clause in clauses):
+        return [(clauses, vars_)]
+
+    parent = {var: var for var in vars_}
+
+    def find(var: int) -> int:
+        while parent[var] != var:
+            parent[var] = parent[parent[var]]
+            var = parent[var]
+        return var
+
+    for clause in clauses:
+        clause_vars = constraint_vars(clause)
+        root = find(clause_vars[0])
+        for var in clause_vars[1:]:
+            other = find(var)
+            if other != root:
+                parent[other] = root
+
+    components: dict[int, tuple[list[T], list[int]]] = {}
+    for var in vars_:
+        components.setdefault(find(var), ([], []))[1].append(var)
+    for clause in clauses:
+        components[find(constraint_vars(clause)[0])][0].append(clause)
+
+    return list(components.values())
+
+
+def propagate(
+    constraints: list[Constraint], vars_: list[int]
+) -> tuple[list[int], list[int], list[Constraint], list[int]]:
+    """Decide the cells that single constraints or pairs of them already force
+
+    A constraint asking for no mine (or for all its cells to be mines) decides
+    all its cells. When a constraint A is included in a constraint B, the cells
+    of B outside of A hold exactly `B.count - A.count` mines, which decides them
+    in the same way. Both rules are applied until nothing changes.
+
+    Args:
+        constraints (list[Constraint]): The constraints of the field
+        vars_ (list[int]): The variables appearing in the constraints
+
+    Returns:
+        tuple[list[int], list[int], list[Constraint], list[int]]: forced mines,
+            safe cells, and the constraints and variables left undecided. If a
+            contradiction is found, nothing is decided and the constraints are
+            returned as is, for the search to report it.
+    """
+
+    known: dict[int, bool] = {}
+    current = constraints
+
+    def decide(cells: list[int], value: bool) -> bool:
+        """Record cells as decided, returns False on contradiction"""
+        for var in cells:
+            if known.setdefault(var, value) != value:
+                return False
+        return True
+
+    while True:
+        decided = len(known)
+
+        # Remove the decided cells from the constraints
+        reduced = []
+        for cvars, count, slack in current:
+            rest = [var for var in cvars if var not in known]
+            count -= sum(known[var] for var in cvars if var in known)
+            if count < 0 or count - slack > len(rest):
+                return [], [], constraints, vars_
+            if rest:
+                reduced.append(Constraint(rest, count, slack))
+        current = reduced
+
+        for cvars, count, slack in current:
+            if count == 0 and not decide(cvars, False):
+                return [], [], constraints, vars_
+            if count - slack == len(cvars) and not decide(cvars, True):
+                return [], [], constraints, vars_
+        if len(known) > decided:
+            continue
+
+        # Subset rule, a subset shares in particular its first cell
+        occurs: dict[int, list[int]] = {}
+        for cid, constraint in enumerate(current):
+            for var in constraint.vars:
+                occurs.setdefault(var, []).append(cid)
+        sets = [set(constraint.vars) for constraint in current]
+
+        for a, (avars, acount, aslack) in enumerate(current):
+            for b in occurs[avars[0]]:
+                if len(sets[b]) <= len(sets[a]) or not sets[a] <= sets[b]:
+                    continue
+                # Only exact counts tell how many mines the difference holds
+                if aslack or current[b].slack:
+                    continue
+
+                diff = [var for var in current[b].vars if var not in sets[a]]
+                count = current[b].count - acount
+                if not 0 <= count <= len(diff):
+                    return [], [], constraints, vars_
+                if count == 0 and not decide(diff, False):
+                    return [], [], constraints, vars_
+                if count == len(diff) and not decide(diff, True):
+                    return [], [], constraints, vars_
+        if len(known) == decided:
+            break
+
+    mines = [var for var, value in known.items() if value]
+    safe = [var for var, value in known.items() if not value]
+    left = {var for constraint in current for var in constraint.vars}
+    return mines, safe, current, [var for var in vars_ if var in left]
+
+
+def find_backbone(
+    vars_: list[int],
+    search: Callable[[dict[int, bool]], dict[int, bool] | None],
+    model: dict[int, bool] | None = None,
+    find_mines: bool = True,
+    find_safe: bool = False,
+) -> tuple[list[int], list[int]]:
+    """Find the variables that are True (mines) or False (safe) in every model
+
+    Every model found along the way is remembered: once a variable has been
+    False in some model it can not be a forced mine, so it needs no search of its
+    own (and symmetrically for True and safe cells).
+
+    Args:
+        vars_ (list[int]): The variables to decide
+        search (Callable[[dict[int, bool]], dict[int, bool]  |  None]): Finds a
+            model (can be partial, unassigned variables are free) extending the
+            given assumptions, or returns None if there is none
+        model (dict[int, bool] | None, optional): A model already found, e.g.
+            when checking the field. Defaults to None.
+        find_mines (bool, optional): Look for forced mines. Defaults to True.
+        find_safe (bool, optional): Look for safe cells. Defaults to False.
+
+    Returns:
+        tuple[list[int], list[int]]: forced mines and safe cells. When there is
+            no model at all, every variable is reported as a mine.
+
+    Raises:
+        BudgetExceeded: when a search runs out of budget, with the variables
+            decided so far in its `partial` attribute
+    """
+
+    can_be_false: set[int] = set()
+    can_be_true: set[int] = set()
+    mines: list[int] = []
+    safe: list[int] = []
+
+    def record(model: dict[int, bool]) -> None:
+        for var in vars_:
+            if var not in model:
+                can_be_false.add(var)
+                can_be_true.add(var)
+            elif model[var]:
+                can_be_true.add(var)
+            else:
+                can_be_false.add(var)
+
+    try:
+        if model is None:
+            model = search({})
+            if model is None:
+                return list(vars_), []
+
+        record(model)
+
+        if find_mines:
+            for var in vars_:
+                if var in can_be_false:
+                    continue
+
+                model = search({var: False})
+                if model is None:
+                    mines.append(var)
+                else:
+                    record(model)
+
+        if find_safe:
+            for var in vars_:
+                if var in can_be_true:
+                    continue
+
+                model = search({var: True})
+                if model is None:
+                    safe.append(var)
+                else:
+                    record(model)
+
+    except BudgetExceeded as e:
+        # Keep what was proven before the budget ran out
+        decided = set(mines) | set(safe)
+        e.partial = (
+            mines,
+            safe,
+            [
+                var
+                for var in vars_
+                if var not in decided
+                and (
+                    (find_mines and var not in can_be_false)
+                    or (find_safe and var not in can_be_true)
+                )
+            ],
+        )
+        raise
+
+    return mines, safe
+
+
+def count_calls(search: Search, stats: SolveStats) -> Search:
+    """Wrap a search to count its calls in `stats.sat_calls`"""
+
+    def counted(assumptions: dict[int, bool]) -> dict[int, bool] | None:
+        stats.sat_calls += 1
+        return search(assumptions)
+
+    return counted
+
+
+def mine_count_constraint(
+    constraints: list[Constraint], vars_: list[int], remaining: int, interior: int
+) -> Constraint | None:
+    """Constraint of the total number of mines over the frontier
+
+    The `interior` cells next to no number hold whatever the frontier leaves,
+    so the frontier holds between `remaining - interior` and `remaining` mines.
+    The constraint connects every component, so it is left out (None) when
+    bounds on the mines of each component show it can not change anything:
+    the count always stays in range and leaves the interior cells free.
+
+    Args:
+        constraints (list[Constraint]): The constraints of the frontier
+        vars_ (list[int]): The variables of the frontier
+        remaining (int): Mines not flagged or deduced yet
+        interior (int): Number of interior cells
+
+    Returns:
+        Constraint | None: The constraint, or None when it is not needed
+    """
+
+    if not vars_:
+        return None
+
+    # A component holds at least as many mines as any of its constraints asks
+    # for, and at most all of them together
+    low = high = 0
+    for comp_constraints, comp_vars in split_components(constraints, vars_):
+        low += max(count - slack for _, count, slack in comp_constraints)
+        high += min(len(comp_vars), sum(c.count for c in comp_constraints))
+
+    margin = 1 if interior else 0
+    if low >= remaining - interior + margin and high <= remaining - margin:
+        return None
+    return Constraint(list(vars_), remaining, interior)
+
+
+def check_budget(search: Search, budget: Budget) -> Search:
+    """Wrap a search to stop it once the budget has run out"""
+
+    def checked(assumptions: dict[int, bool]) -> dict[int, bool] | None:
+        budget.check()
+        return search(assumptions)
+
+    return checked
+
 
-    # Add CNF clauses for each opened cell.
-    for i in range(height):
-        for j in range(width):
-            # We only care about "opened" cells, since only them can provide information
-            # to create clauses.
-            # We also ignore "opened cell" that is 0, because in the minesweeper game,
-            # every cell around it has already been opened by default.
-            if (
-                field[i][j] == 0
-                or field[i][j] == FLAGGED_VAL
-                or field[i][j] == UNOPENED_VAL
-            ):
-                continue
+def deduce_field(
+    field: Field | ArrayField,
+    create_search: Callable[[list[Constraint], list[int]], Search],
+    check_field: bool = False,
+    display_checking_time: bool = True,
+    cache: ComponentCache | None = None,
+    stats: SolveStats | None = None,
+    budget: Budget | None = None,
+    mark_safe: bool = False,
+    total_mines: int | None = None,
+) -> Field | ArrayField:
+    """Flag the forced mines of a field with the given search engine
 
-            surrounded_mines = field[i][j]
-            neighbors = []
-            for y in range(max(0, i - 1), min(height, i + 2)):
-                for x in range(max(0, j - 1), min(width, j + 2)):
-                    if y == i and x == j:
-                        continue
+    The constraints of the field go through `propagate` first, then every
+    independent component of what is left gets its own search.
 
-                    if field[y][x] == FLAGGED_VAL:
-                        surrounded_mines -= 1
-                        continue
+    Args:
+        field (Field | ArrayField): The field to solve
+        create_search (Callable[[list[Constraint], list[int]], Search]): Builds
+            the search of one component from its constraints and variables
+        check_field (bool, optional): Raise a ValueError if the field has no
+            solution. Defaults to False.
+        display_checking_time (bool, optional): Print the time spent checking.
+            Defaults to True.
+        cache (ComponentCache | None, optional): Cache of solved components,
+            looked up before searching a component. Defaults to None.
+        stats (SolveStats | None, optional): Filled in with the timings and
+            sizes of the solve, and the number of searches. Defaults to None.
+        budget (Budget | None, optional): Time and node budget of the searches.
+            Defaults to None.
+        mark_safe (bool, optional): Also look for the cells that can not be a
+            mine, with the same searches. Defaults to False.
+        total_mines (int | None, optional): Number of mines of the whole board
+            (flags included), added as a constraint over all the unopened
+            cells. Defaults to None.
 
-                    if field[y][x] != UNOPENED_VAL:
-                        continue
+    Returns:
+        Field | ArrayField: A copy of the field, of the same type, with forced
+            mines set to `FLAGGED_VAL`, and safe cells set to `SAFE_VAL` if
+            `mark_safe`. The cells left unopened can be either. If the budget
+            ran out, the cells proven safe so far are set to `SAFE_VAL` anyway
+            and the undecided ones to `UNKNOWN_VAL`.
+    """
+
+    start = time.perf_counter()
+    # Copy-on-write: the field is only copied once the first cell is flagged
+    board = ArrayField.from_field(field)
+    constraints, vars_ = construct_constraints(board)
+    if stats is not None:
+        stats.vars += len(vars_)
+        stats.constraints += len(constraints)
+
+    frontier = set(vars_)
+    mines, safe, constraints, vars_ = propagate(constraints, vars_)
+    width = board.width
+
+    def prepare(constraints: list[Constraint], vars_: list[int]) -> Search:
+        search = create_search(constraints, vars_)
+        if stats is not None:
+            search = count_calls(search, stats)
+        if budget is not None:
+            search = check_budget(search, budget)
+        return search
+
+    # The total number of mines also counts the unopened cells next to no
+    # number (the interior), they are not variables but widen its range
+    interior: list[int] = []
+    remaining = 0
+    count_constraint = None
+    if total_mines is not None:
+        interior = [
+            index + 1
+            for index, cell in enumerate(board.cells)
+            if cell == UNOPENED_VAL and index + 1 not in frontier
+        ]
+        flags = board.cells.count(FLAGGED_VAL)
+        remaining = total_mines - flags - len(mines)
+        count_constraint = mine_count_constraint(
+            constraints, vars_, remaining, len(interior)
+        )
+    local_constraints = constraints
+    if count_constraint is not None:
+        constraints = constraints + [count_constraint]
+    # The interior is all mines or all safe when the frontier always leaves all
+    # or none of the remaining mines to it
+    decide_interior = bool(interior) and (not vars_ or count_constraint is not None)
+
+    components = split_components(constraints, vars_)
+    searches: list[Search | None] = []
+    for comp_constraints, comp_vars in components:
+        hit = None
+        if cache is not None:
+            hit = cache.lookup(comp_constraints, comp_vars, width)
+            if stats is not None:
+                stats.cache_hits += hit is not None
+                stats.cache_misses += hit is None
+
+        if hit is None:
+            searches.append(prepare(comp_constraints, comp_vars))
+        else:
+            mines.extend(hit[0])
+            safe.extend(hit[1])
+            searches.append(None)
+    models: list[dict[int, bool] | None] = [None] * len(searches)
 
-                    # Convert 2D coordinates to 1D (starting from 1)
-                    pos = y * width + x + 1
-                    neighbors.append(pos)
+    if stats is not None:
+        stats.residual_vars += len(vars_)
+        stats.components += len(components)
+        stats.construct_time += time.perf_counter() - start
 
-            vars_.update(neighbors)
+    # Variables left undecided when the budget runs out
+    undecided: list[int] = []
 
-            # Encode "at most" constraint as CNF clauses
-            for c in combinations(neighbors, surrounded_mines + 1):
-                clauses.append([-x for x in c])
+    def give_up(first: int) -> None:
+        for search, (_, comp_vars) in zip(searches[first:], components[first:]):
+            if search is not None:
+                undecided.extend(comp_vars)
 
-            # Encode "at least" constraint as CNF clauses
-            for c in combinations(neighbors, len(neighbors) - surrounded_mines + 1):
-                clauses.append([x for x in c])
+    # Check if the grid is valid (solvable) or not if required
+    if check_field:
+        start = time.perf_counter()
+        if display_checking_time:
+            process_start = time.process_time()
 
-    return clauses, list(vars_)
+        # With no variable left, nothing else checks the global count
+        if total_mines is not None and not vars_:
+            if not 0 <= remaining <= len(interior):
+                raise ValueError("Unsolvable grid")
+
+        # Cached components are known to be solvable
+        try:
+            for i, search in enumerate(searches):
+                if search is None:
+                    continue
+                models[i] = search({})
+                if models[i] is None:
+                    raise ValueError("Unsolvable grid")
+        except BudgetExceeded:
+            give_up(0)
+
+        if display_checking_time:
+            print("check: ", time.process_time() - process_start, "s")
+        if stats is not None:
+            stats.check_time += time.perf_counter() - start
+
+    # Finding process
+    start = time.perf_counter()
+    for i, ((comp_constraints, comp_vars), search, model) in enumerate(
+        zip(components, searches, models)
+    ):
+        if search is None or undecided:
+            continue
+
+        try:
+            if cache is None:
+                comp_mines, comp_safe = find_backbone(
+                    comp_vars, search, model, find_safe=mark_safe
+                )
+            else:
+                # Cache entries hold both mines and safe cells, and only
+                # solvable components are cached
+                if model is None:
+                    model = search({})
+                if model is None:
+                    comp_mines, comp_safe = list(comp_vars), []
+                else:
+                    comp_mines, comp_safe = find_backbone(
+                        comp_vars, search, model, find_safe=True
+                    )
+                    cache.store(
+                        comp_constraints, comp_vars, width, comp_mines, comp_safe
+                    )
+        except BudgetExceeded as e:
+            if e.partial is not None:
+                mines.extend(e.partial[0])
+                safe.extend(e.partial[1])
+                undecided.extend(e.partial[2])
+            else:
+                undecided.extend(comp_vars)
+            give_up(i + 1)
+            break
+
+        mines.extend(comp_mines)
+        safe.extend(comp_safe)
+
+    if decide_interior and not undecided:
+        try:
+            if vars_:
+                # At least one interior mine, then at least one interior safe cell
+                some_mine = Constraint(vars_, remaining - 1, len(interior) - 1)
+                some_safe = Constraint(vars_, remaining, len(interior) - 1)
+                can_be_mine = (
+                    prepare(local_constraints + [some_mine], vars_)({}) is not None
+                )
+                can_be_safe = (
+                    prepare(local_constraints + [some_safe], vars_)({}) is not None
+                )
+            else:
+                can_be_mine = 1 <= remaining <= len(interior)
+                can_be_safe = 0 <= remaining < len(interior)
+        except BudgetExceeded:
+            undecided.extend(interior)
+        else:
+            if not can_be_mine and not can_be_safe:
+                if check_field:
+                    raise ValueError("Unsolvable grid")
+                mines.extend(interior)
+            elif not can_be_mine:
+                safe.extend(interior)
+            elif not can_be_safe:
+                mines.extend(interior)
+    elif decide_interior:
+        undecided.extend(interior)
+
+    if stats is not None:
+        stats.deduction_time += time.perf_counter() - start
+        stats.budget_exceeded = stats.budget_exceeded or bool(undecided)
+
+    for var in mines:
+        board.set_cell(var - 1, FLAGGED_VAL)
+
+    # A partial result also tells which cells are proven safe, to tell them
+    # apart from the undecided ones
+    if mark_safe or undecided:
+        for var in safe:
+            board.set_cell(var - 1, SAFE_VAL)
+        for var in undecided:
+            board.set_cell(var - 1, UNKNOWN_VAL)
+
+    if isinstance(field, ArrayField):
+        return board
+    return board.to_field()
 
 
 class KB:
@@ -96,6 +814,14 @@ class KB:
             self.vars = vars_
             if create_idx_dict:
                 self.idx_dict = {var: i for i, var in enumerate(vars_)}
+                self.create_occurrences()
+
+    def create_occurrences(self) -> None:
+        """Index the clauses containing each variable (by its index in `vars`)"""
+        self.occurrences: list[list[int]] = [[] for _ in self.vars]
+        for cid, clause in enumerate(self.clauses):
+            for idx in {self.idx_dict[abs(lit)] for lit in clause}:
+                self.occurrences[idx].append(cid)
 
     def add_clause(self, clause: list[int]) -> None:
         self.clauses.append(clause)
@@ -177,11 +903,12 @@ class KB:
             return Answer.TRUE, count
         return Answer.UNKNOWN, count
 
-    def num_false_clauses(self, model: tuple[bool | None]) -> int:
-        """Count the number of false clauses (can be partial)
+    def num_false_clauses(self, model: int) -> int:
+        """Count the number of false clauses
 
         Args:
-            model (tuple[bool  |  None]): The model to apply
+            model (int): The model to apply, as a bitmask where bit i is the
+                value of `vars[i]`
 
         Returns:
             int: number of clauses that are false
@@ -194,14 +921,251 @@ class KB:
 
             for var in clause:
                 if var > 0:
-                    if model[self.idx_dict[abs(var)]]:
+                    if model >> self.idx_dict[var] & 1:
                         correct = True
                         break
                 else:
-                    if not model[self.idx_dict[abs(var)]]:
+                    if not model >> self.idx_dict[-var] & 1:
                         correct = True
                         break
 
             if not correct:
                 count += 1
         return count
+
+    def num_false_clauses_batch(self, models: Sequence[int]) -> list[int]:
+        """Count the number of false clauses of many models at once
+
+        Args:
+            models (Sequence[int]): The models to apply, as bitmasks
+
+        Returns:
+            list[int]: number of clauses that are false, for each model
+        """
+        return [self.num_false_clauses(model) for model in models]
+
+    def flip_delta(self, model: int, idx: int) -> int:
+        """Change of `num_false_clauses` when one variable of the model is flipped
+
+        Only the clauses containing the variable are visited.
+
+        Args:
+            model (int): The model to apply, as a bitmask
+            idx (int): Index of the variable to flip
+
+        Returns:
+            int: number of false clauses of the flipped model, minus the one of
+                the model
+        """
+
+        var = self.vars[idx]
+        val = bool(model >> idx & 1)
+        delta = 0
+
+        for cid in self.occurrences[idx]:
+            # Whether the clause is satisfied before and after the flip
+            before = False
+            after = False
+            by_others = False
+
+            for lit in self.clauses[cid]:
+                if abs(lit) == var:
+                    if (lit > 0) == val:
+                        before = True
+                    else:
+                        after = True
+                elif (lit > 0) == bool(model >> self.idx_dict[abs(lit)] & 1):
+                    by_others = True
+                    break
+
+            if not by_others:
+                delta += before - after
+
+        return delta
+
+    def flip_deltas(self, model: int, idxs: list[int]) -> list[int]:
+        """`flip_delta` of many variables of the same model"""
+        return [self.flip_delta(model, idx) for idx in idxs]
+
+
+def split_wide(
+    constraints: list[Constraint],
+) -> tuple[list[Constraint], list[Constraint]]:
+    """Split the constraints expanded into plain clauses from the wider ones
+    (e.g. the global mine count)"""
+    narrow = [c for c in constraints if len(c.vars) <= MAX_EXPANDED_VARS]
+    wide = [c for c in constraints if len(c.vars) > MAX_EXPANDED_VARS]
+    return narrow, wide
+
+
+class CountKB:
+    """Wide cardinality constraints checked on bitmask models with popcounts
+
+    The A* engines search over bitmasks of the variables. Encoding the global
+    mine count with a sequential counter would add its auxiliary variables to
+    those bitmasks and blow up the search space, so it is counted instead.
+
+    Args:
+        constraints (list[Constraint]): The constraints, between
+            `count - slack` and `count` mines
+        idx_dict (dict[int, int]): Bit of each variable in the models
+    """
+
+    def __init__(self, constraints: list[Constraint], idx_dict: dict[int, int]):
+        self.bounds: list[tuple[int, int, int]] = []
+        for vars_, count, slack in constraints:
+            mask = 0
+            for var in vars_:
+                mask |= 1 << idx_dict[var]
+            self.bounds.append((mask, count - slack, count))
+
+    def distance(self, model: int) -> int:
+        """Number of mines to add or remove for every constraint to hold"""
+        total = 0
+        for mask, low, high in self.bounds:
+            mines = (model & mask).bit_count()
+            total += max(low - mines, mines - high, 0)
+        return total
+
+    def flip_deltas(self, model: int, idxs: list[int]) -> list[int]:
+        """Change of `distance` when each of the given variables is flipped"""
+        deltas = [0] * len(idxs)
+        for mask, low, high in self.bounds:
+            mines = (model & mask).bit_count()
+            before = max(low - mines, mines - high, 0)
+            for k, idx in enumerate(idxs):
+                if mask >> idx & 1:
+                    after = mines - 1 if model >> idx & 1 else mines + 1
+                    deltas[k] += max(low - after, after - high, 0) - before
+        return deltas
+
+    def status(self, assigned: int, values: int) -> tuple[Answer, int]:
+        """Like `KB.is_satisfied_extended`, for a partial model given as the
+        bitmasks of its assigned variables and of their values"""
+        count = 0
+        for mask, low, high in self.bounds:
+            mines = (values & mask).bit_count()
+            unassigned = (mask & ~assigned).bit_count()
+            if mines > high or mines + unassigned < low:
+                return Answer.FALSE, -1
+            if mines < low or mines + unassigned > high:
+                count += 1
+
+        if count == 0:
+            return Answer.TRUE, count
+        return Answer.UNKNOWN, count
+
+
+class CardinalityKB:
+    """Knowledge base over cardinality constraints, evaluated with counters
+
+    It has the same checking interface as `KB`, but every constraint is kept as
+    its neighbor list and mine count instead of the clauses expanding it.
+    """
+
+    def __init__(
+        self,
+        from_constraints: list[Constraint] | None = None,
+        vars_: list[int] | None = None,
+        create_idx_dict: bool = False,
+    ) -> None:
+        if from_constraints is None:
+            self.constraints = []
+        else:
+            self.constraints = from_constraints
+        if vars_ is None:
+            self.vars = []
+        else:
+            self.vars = vars_
+            if create_idx_dict:
+                self.idx_dict = {var: i for i, var in enumerate(vars_)}
+
+    def add_constraint(self, constraint: Constraint) -> None:
+        self.constraints.append(constraint)
+        self.vars.extend(constraint.vars)
+
+    def is_satisfied(self, model: dict[int, bool]) -> bool:
+        """Check if a model (can be partial) satisfies all constraints
+
+        Args:
+            model (dict[int, bool]): The model to check
+
+        Returns:
+            bool: True if the model satisfies all constraints, False otherwise
+        """
+        for vars_, count, slack in self.constraints:
+            trues = 0
+            unassigned = 0
+
+            for var in vars_:
+                if var in model:
+                    if model[var]:
+                        trues += 1
+                else:
+                    unassigned += 1
+
+            # A partial model satisfies a constraint only when every completion
+            # does, the same as a clause without true literals
+            if trues < count - slack or trues + unassigned > count:
+                return False
+
+        return True
+
+    def is_satisfied_extended(self, model: dict[int, bool]) -> tuple[Answer, int]:
+        """Check if a model (can be partial) satisfies all constraints (extended
+        version)
+
+        Args:
+            model (dict[int, bool]): The model to check
+
+        Returns:
+            tuple[Answer, int]:
+                - Answer: can be TRUE, FALSE, or UNKNOWN (when there are
+                  undetermined constraints).
+                - int: number of undetermined constraints (0 for TRUE, -1 for
+                  FALSE)
+        """
+
+        count = 0
+
+        for vars_, mines, slack in self.constraints:
+            trues = 0
+            unassigned = 0
+
+            for var in vars_:
+                if var in model:
+                    if model[var]:
+                        trues += 1
+                else:
+                    unassigned += 1
+
+            if trues > mines or trues + unassigned < mines - slack:
+                return Answer.FALSE, -1
+            if unassigned:
+                count += 1
+
+        if count == 0:
+            return Answer.TRUE, count
+        return Answer.UNKNOWN, count
+
+    def num_false_clauses(self, model: int) -> int:
+        """Count the number of violated constraints
+
+        Args:
+            model (int): The model to apply, as a bitmask where bit i is the
+                value of `vars[i]`
+
+        Returns:
+            int: number of constraints that are violated
+        """
+
+        count = 0
+
+        for vars_, mines, slack in self.constraints:
+            trues = 0
+            for var in vars_:
+                trues += model >> self.idx_dict[var] & 1
+
+            if not mines - slack <= trues <= mines:
+                count += 1
+        return count
@@ -0,0 +1,48 @@
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class SolveStats:
+    """Statistics of one solve, filled in by the solvers when given one
+
+    Times are wall-clock seconds. Counters add up over all the components of
+    the field, except `frontier_peak` and `explored` which are maximums.
+    """
+
+    # Phase timings
+    construct_time: float = 0.0
+    check_time: float = 0.0
+    deduction_time: float = 0.0
+
+    # Size of the problem
+    vars: int = 0
+    constraints: int = 0
+    residual_vars: int = 0
+    components: int = 0
+    clauses: int = 0
+
+    # Search effort
+    sat_calls: int = 0
+    nodes: int = 0
+    frontier_peak: int = 0
+    explored: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    # True when the budget ran out before every cell was decided
+    budget_exceeded: bool = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def add(self, other: "SolveStats") -> None:
+        """Add the statistics of another solve, as if it was given these"""
+        for name, value in other.as_dict().items():
+            if name in ("frontier_peak", "explored"):
+                value = max(getattr(self, name), value)
+            elif name == "budget_exceeded":
+                value = self.budget_exceeded or value
+            else:
+                value += getattr(self, name)
+            setattr(self, name, value)
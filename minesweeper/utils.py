@@ -1,30 +1,98 @@
 from minesweeper._global import *
 from enum import Enum
+from typing import Generator, Iterable
 
 UNOPENED_PRINT_CHAR = "■"
 FLAGGED_PRINT_CHAR = "⚐"
+SAFE_PRINT_CHAR = "○"
+UNKNOWN_PRINT_CHAR = "?"
 EMPTY_PRINT_CHAR = " "
 
 
+# Cell value of each token of a field file, for the fast parsing path
+TOKEN_VALUES = {str(n): n for n in range(9)} | {
+    UNOPENED_CHAR: UNOPENED_VAL,
+    FLAGGED_CHAR: FLAGGED_VAL,
+    SAFE_CHAR: SAFE_VAL,
+    UNKNOWN_CHAR: UNKNOWN_VAL,
+}
+VALUE_TOKENS = {value: token for token, value in TOKEN_VALUES.items()}
+
+
+def parse_item(item: str) -> int:
+    item = item.strip()
+
+    if item.isdigit():
+        return int(item)
+    elif item == UNOPENED_CHAR:
+        return UNOPENED_VAL
+    elif item == FLAGGED_CHAR:
+        return FLAGGED_VAL
+    elif item == SAFE_CHAR:
+        return SAFE_VAL
+    elif item == UNKNOWN_CHAR:
+        return UNKNOWN_VAL
+    else:
+        raise ValueError("Invalid character in input file")
+
+
+def parse_row(line: str) -> list[int]:
+    """Parse one line of a field file
+
+    The tokens are looked up in a table, which covers every well-formed line;
+    anything else (other whitespace, larger numbers, errors) goes through the
+    cell by cell `parse_item`.
+    """
+    try:
+        return [TOKEN_VALUES[item] for item in line.strip().replace(" ", "").split(",")]
+    except KeyError:
+        return [parse_item(item) for item in line.split(",")]
+
+
+def format_field(data: Field) -> str:
+    """Text of a field, as written by `write_field`"""
+    return "".join(
+        ", ".join([VALUE_TOKENS.get(item) or str(item) for item in row]) + "\n"
+        for row in data
+    )
+
+
+def iter_fields(file_name: str) -> Generator[Field, None, None]:
+    """Read the fields of a file lazily, one at a time
+
+    Fields are separated by blank lines, so a file written by `write_fields` (or
+    a single field written by `write_field`) can be read back.
+    """
+    with open(file_name, "r") as f:
+        data: Field = []
+        for line in f:
+            if line.isspace():
+                if data:
+                    yield data
+                    data = []
+                continue
+
+            data.append(parse_row(line))
+
+        if data:
+            yield data
+
+
 def read_field(file_name: str) -> Field:
-    """Reads input file and returns an array"""
+    """Reads input file and returns an array
+
+    Blank lines may only end the file, use `iter_fields` for files with many
+    fields.
+    """
     with open(file_name, "r") as f:
-        data = []
+        data: Field = []
         for line in f:
-            row = []
-            for item in line.split(","):
-                item = item.strip()
-
-                if item.isdigit():
-                    row.append(int(item))
-                elif item == UNOPENED_CHAR:
-                    row.append(UNOPENED_VAL)
-                elif item == FLAGGED_CHAR:
-                    row.append(FLAGGED_VAL)
-                else:
-                    raise ValueError("Invalid character in input file")
+            if line.isspace():
+                break
+            data.append(parse_row(line))
 
-            data.append(row)
+        if any(not line.isspace() for line in f):
+            raise ValueError("More than one field in input file")
 
     return data
 
@@ -32,19 +100,42 @@ def read_field(file_name: str) -> Field:
 def write_field(data: Field, file_name: str) -> None:
     """Writes array to file"""
     with open(file_name, "w") as f:
-        for row in data:
-            to_write = []
-            for item in row:
-                if item == UNOPENED_VAL:
-                    to_write.append(UNOPENED_CHAR)
-                elif item == FLAGGED_VAL:
-                    to_write.append(FLAGGED_CHAR)
-                else:
-                    to_write.append(str(item))
+        f.write(format_field(data))
 
-            f.write(", ".join(to_write))
+
+def write_fields(
+    fields: Iterable[Field],
+    file_name: str,
+    append: bool = False,
+    buffer_size: int = 1 << 20,
+) -> int:
+    """Write many fields to a file, separated by blank lines
+
+    Args:
+        fields (Iterable[Field]): The fields, consumed lazily
+        file_name (str): The file to write
+        append (bool, optional): Add the fields after the ones already in the
+            file. Defaults to False.
+        buffer_size (int, optional): Bytes buffered before each write to the
+            file. Defaults to 1 MiB.
+
+    Returns:
+        int: number of fields written
+    """
+
+    count = 0
+    with open(file_name, "a" if append else "w", buffering=buffer_size) as f:
+        if append and f.tell() > 0:
             f.write("\n")
 
+        for data in fields:
+            if count:
+                f.write("\n")
+            f.write(format_field(data))
+            count += 1
+
+    return count
+
 
 def print_field(data: Field) -> None:
     for row in data:
@@ -53,6 +144,10 @@ def print_field(data: Field) -> None:
                 print(UNOPENED_PRINT_CHAR, end=" ")
             elif cell == FLAGGED_VAL:
                 print(FLAGGED_PRINT_CHAR, end=" ")
+            elif cell == SAFE_VAL:
+                print(SAFE_PRINT_CHAR, end=" ")
+            elif cell == UNKNOWN_VAL:
+                print(UNKNOWN_PRINT_CHAR, end=" ")
             else:
                 if cell == 0:
                     print(EMPTY_PRINT_CHAR, end=" ")
@@ -0,0 +1,141 @@
+"""Brute-force answers for small fields, to check the solvers against
+
+Every assignment of the unopened cells is tried, so the fields must stay small
+(`random_field` keeps at most `max_unopened` cells unopened).
+"""
+
+from minesweeper._global import Field, FLAGGED_VAL, SAFE_VAL, UNOPENED_VAL
+
+import random
+from itertools import product
+
+
+def neighbors(height: int, width: int, i: int, j: int) -> list[tuple[int, int]]:
+    return [
+        (y, x)
+        for y in range(max(0, i - 1), min(height, i + 2))
+        for x in range(max(0, j - 1), min(width, j + 2))
+        if y != i or x != j
+    ]
+
+
+def random_game(
+    rng: random.Random, height: int, width: int, mines: int
+) -> tuple[set[tuple[int, int]], dict[tuple[int, int], int]]:
+    """Mines of a random game and the number of every safe cell"""
+    cells = [(i, j) for i in range(height) for j in range(width)]
+    mine_cells = set(rng.sample(cells, mines))
+    numbers = {
+        cell: sum(n in mine_cells for n in neighbors(height, width, *cell))
+        for cell in cells
+        if cell not in mine_cells
+    }
+    return mine_cells, numbers
+
+
+def open_cell(
+    field: Field, numbers: dict[tuple[int, int], int], i: int, j: int
+) -> list[tuple[int, int, int]]:
+    """Open a safe cell as the game does, zeros open their neighbors too
+
+    Returns:
+        list[tuple[int, int, int]]: The opened cells, as (row, column, value)
+    """
+    height, width = len(field), len(field[0])
+    opened = []
+    stack = [(i, j)]
+    while stack:
+        y, x = stack.pop()
+        if field[y][x] != UNOPENED_VAL:
+            continue
+        field[y][x] = numbers[(y, x)]
+        opened.append((y, x, field[y][x]))
+        if field[y][x] == 0:
+            stack.extend(neighbors(height, width, y, x))
+    return opened
+
+
+def random_field(
+    rng: random.Random,
+    height: int,
+    width: int,
+    mines: int,
+    max_unopened: int = 12,
+    flag_rate: float = 0.3,
+) -> tuple[Field, int]:
+    """Field of a random game with random safe cells opened and some mines
+    flagged, and its total number of mines"""
+    mine_cells, numbers = random_game(rng, height, width, mines)
+    field = [[UNOPENED_VAL] * width for _ in range(height)]
+
+    safe = list(numbers)
+    rng.shuffle(safe)
+    unopened = height * width
+    for i, j in safe:
+        if unopened <= max_unopened and rng.random() < 0.5:
+            break
+        unopened -= len(open_cell(field, numbers, i, j))
+
+    for i, j in mine_cells:
+        if rng.random() < flag_rate:
+            field[i][j] = FLAGGED_VAL
+
+    return field, mines
+
+
+def solutions(field: Field, total_mines: int | None = None) -> list[set[int]]:
+    """Every consistent placement of mines, as the variables of the unopened
+    cells that are mines (`i * width + j + 1`)
+
+    With `total_mines`, only the placements with that many mines (flags
+    included) are kept.
+    """
+    height, width = len(field), len(field[0])
+    unopened = [
+        (i, j)
+        for i, row in enumerate(field)
+        for j, value in enumerate(row)
+        if value == UNOPENED_VAL
+    ]
+    numbers = [
+        (value, neighbors(height, width, i, j))
+        for i, row in enumerate(field)
+        for j, value in enumerate(row)
+        if value >= 0
+    ]
+    flags = sum(row.count(FLAGGED_VAL) for row in field)
+
+    models = []
+    for values in product((False, True), repeat=len(unopened)):
+        if total_mines is not None and flags + sum(values) != total_mines:
+            continue
+        mines = {cell for cell, mine in zip(unopened, values) if mine}
+        if all(
+            sum((y, x) in mines or field[y][x] == FLAGGED_VAL for y, x in cells)
+            == value
+            for value, cells in numbers
+        ):
+            models.append({i * width + j + 1 for i, j in mines})
+    return models
+
+
+def expected_solution(
+    field: Field, total_mines: int | None = None, mark_safe: bool = False
+) -> Field:
+    """What a solver must return: the field with the cells that are mines in
+    every solution flagged, and those that are in none marked safe"""
+    models = solutions(field, total_mines)
+    assert models, "the field has no solution"
+
+    width = len(field[0])
+    result = [row[:] for row in field]
+    for i, row in enumerate(field):
+        for j, value in enumerate(row):
+            var = i * width + j + 1
+            if value != UNOPENED_VAL:
+                continue
+            if all(var in model for model in models):
+                result[i][j] = FLAGGED_VAL
+            elif mark_safe and not any(var in model for model in models):
+                result[i][j] = SAFE_VAL
+    return result
@@ -0,0 +1,20 @@
+from minesweeper import ArrayField
+
+import pytest
+
+
+def test_row_views() -> None:
+    field = ArrayField.from_field([[1, -2], [-2, -2]])
+    copy = field.copy()
+
+    field[0][1] = -1
+    assert field[0][1] == field[0, 1] == -1
+    assert field[-1][-1] == -2
+    assert field[0][:] == [1, -1]
+    # The write copied the shared array first
+    assert copy == [[1, -2], [-2, -2]]
+
+    with pytest.raises(IndexError):
+        field[0][2]
+    with pytest.raises(IndexError):
+        field[1][-3] = -1
@@ -0,0 +1,61 @@
+from minesweeper import solve_many
+
+import random
+
+import pytest
+
+from oracle import expected_solution, random_field
+
+
+def random_fields(seed: int, count: int) -> list[list[list[int]]]:
+    rng = random.Random(seed)
+    return [
+        random_field(rng, rng.randint(3, 5), rng.randint(3, 5), rng.randint(2, 6))[0]
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_matches_oracle(ordered: bool) -> None:
+    fields = random_fields(9, 20)
+    results = list(solve_many(fields, "dpll", workers=2, ordered=ordered))
+    if ordered:
+        assert [index for index, _ in results] == list(range(len(fields)))
+    assert sorted(index for index, _ in results) == list(range(len(fields)))
+    for index, result in results:
+        assert result == expected_solution(fields[index])
+
+
+def test_timeout() -> None:
+    fields = random_fields(9, 20)
+    results = dict(solve_many(fields, workers=2, timeout=60, mark_safe=True))
+    assert sorted(results) == list(range(len(fields)))
+    for index, field in enumerate(fields):
+        assert results[index] == expected_solution(field, mark_safe=True)
+
+    timeouts = 0
+    for index, result in solve_many(fields, "dpll", workers=2, timeout=0):
+        if isinstance(result, TimeoutError):
+            timeouts += 1
+        else:
+            assert result == expected_solution(fields[index])
+    assert timeouts > 0
+
+
+def test_errors_are_results() -> None:
+    fields = [[[2, -2]], [[1, -2]]]
+    results = dict(solve_many(fields, workers=1, check_field=True))
+    assert isinstance(results[0], ValueError)
+    assert results[1] == [[1, -1]]
+
+
+def test_kwargs_for_the_fields_only() -> None:
+    # The warm-up field of the workers has no room for two mines
+    field = [[1, -2, -2]]
+    results = dict(solve_many([field], workers=1, check_field=True, total_mines=2))
+    assert results[0] == expected_solution(field, total_mines=2) == [[1, -1, -1]]
+
+
+def test_unknown_solver() -> None:
+    with pytest.raises(ValueError):
+        list(solve_many([], "nope"))
@@ -0,0 +1,88 @@
+from minesweeper._global import UNOPENED_VAL
+from minesweeper.benchmark import benchmark, compare, generate_board, percentile
+
+import copy
+from typing import Any
+
+import pytest
+
+
+def test_generate_board() -> None:
+    field = generate_board(3, 16, 30, 0.2)
+    assert field == generate_board(3, 16, 30, 0.2)
+    assert field != generate_board(4, 16, 30, 0.2)
+    assert len(field) == 16 and all(len(row) == 30 for row in field)
+
+    # One click on a zero opens its region, the rest is unopened
+    opened = sum(value != UNOPENED_VAL for row in field for value in row)
+    assert 0 < opened < 16 * 30
+    assert any(0 in row for row in field)
+    assert all(
+        value == UNOPENED_VAL or 0 <= value <= 8 for row in field for value in row
+    )
+
+    more = generate_board(3, 16, 30, 0.2, openings=5)
+    assert sum(value != UNOPENED_VAL for row in more for value in row) >= opened
+
+
+@pytest.mark.parametrize(
+    "q, expected", [(0, 1.0), (10, 1.0), (50, 5.0), (90, 9.0), (95, 10.0), (100, 10.0)]
+)
+def test_percentile(q: float, expected: float) -> None:
+    values = [float(value) for value in range(10, 0, -1)]
+    assert percentile(values, q) == expected
+
+
+def report(median: float, p95: float, peak_memory: int, errors: int = 0) -> dict:
+    entry: dict[str, Any] = {
+        "solver": "pysat",
+        "height": 9,
+        "width": 9,
+        "density": 0.15,
+        "timeouts": 0,
+        "errors": errors,
+        "median": median,
+        "p95": p95,
+        "peak_memory": peak_memory,
+    }
+    return {"meta": {}, "results": [entry]}
+
+
+def test_compare() -> None:
+    baseline = report(0.010, 0.020, 1 << 20)
+    assert compare(baseline, copy.deepcopy(baseline)) == []
+
+    regressions = compare(baseline, report(0.020, 0.020, 2 << 20))
+    assert len(regressions) == 2
+    assert regressions[0].startswith("pysat 9x9 0.15: median")
+    assert regressions[1].startswith("pysat 9x9 0.15: peak_memory")
+
+    # Within the threshold
+    assert compare(baseline, report(0.0115, 0.023, 1 << 20)) == []
+    assert compare(baseline, report(0.0115, 0.023, 1 << 20), threshold=0.1) != []
+    assert compare(baseline, report(0.010, 0.020, 1 << 20, errors=1)) == [
+        "pysat 9x9 0.15: more fields failed or timed out"
+    ]
+    # Entries missing from the baseline are not compared
+    other = report(1.0, 1.0, 1 << 30)
+    other["results"][0]["solver"] = "dpll"
+    assert compare(baseline, other) == []
+
+
+def test_compare_floor() -> None:
+    # Large relative changes of tiny values are noise
+    baseline = report(0.0001, 0.0002, 1024)
+    assert compare(baseline, report(0.0005, 0.0009, 32 * 1024)) == []
+    assert len(compare(baseline, report(0.002, 0.0009, 128 * 1024))) == 2
+
+
+def test_errors_are_recorded() -> None:
+    results = benchmark(
+        ["pysat"],
+        boards=2,
+        trials=1,
+        solver_kwargs={"pysat": {"backend": "no such backend"}},
+    )
+    (entry,) = results["results"]
+    assert entry["errors"] == 2 and entry["median"] is None
+    assert entry["error_messages"] == ["NoSuchSolverError: no such backend"] * 2
@@ -0,0 +1,118 @@
+from minesweeper import SolveStats, pysat_solve
+from minesweeper._global import FLAGGED_VAL, SAFE_VAL, UNKNOWN_VAL, UNOPENED_VAL
+from minesweeper.budget import Budget, BudgetExceeded
+from minesweeper.pysat_solver import solve_limited
+from minesweeper.registry import SOLVERS
+
+import random
+import threading
+import time
+
+import pysat.solvers
+import pytest
+from pysat.examples.genhard import PHP
+
+from oracle import expected_solution, random_field
+
+
+def random_fields(seed: int, count: int) -> list[list[list[int]]]:
+    rng = random.Random(seed)
+    return [
+        random_field(rng, rng.randint(3, 5), rng.randint(3, 5), rng.randint(2, 6))[0]
+        for _ in range(count)
+    ]
+
+
+def assert_partial(result: list[list[int]], field: list[list[int]]) -> None:
+    """Every cell the partial result decides agrees with the oracle"""
+    full = expected_solution(field, mark_safe=True)
+    for i, row in enumerate(result):
+        for j, value in enumerate(row):
+            if value in (FLAGGED_VAL, SAFE_VAL):
+                assert value == full[i][j]
+            elif value == UNKNOWN_VAL:
+                assert field[i][j] == UNOPENED_VAL
+            else:
+                assert value == field[i][j]
+
+
+def test_budget() -> None:
+    budget = Budget(max_nodes=2)
+    budget.tick(2)
+    assert budget.remaining_nodes() == 0
+    with pytest.raises(BudgetExceeded):
+        budget.tick()
+
+    budget = Budget(deadline=time.monotonic() - 1)
+    with pytest.raises(BudgetExceeded):
+        budget.check()
+    assert budget.remaining_time() == 0
+
+    interrupted = []
+    budget = Budget()
+    budget.interrupts.append(lambda: interrupted.append(True))
+    budget.cancel()
+    assert interrupted == [True]
+    with pytest.raises(BudgetExceeded):
+        budget.check()
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_partial_results(name: str) -> None:
+    solve = SOLVERS[name]
+    exceeded = 0
+    for k, field in enumerate(random_fields(7, 30)):
+        stats = SolveStats()
+        if k % 2:
+            kwargs = {"max_nodes": k % 7}
+        else:
+            kwargs = {"deadline": time.monotonic()}
+        result = solve(field, False, False, stats=stats, **kwargs)
+
+        assert_partial(result, field)
+        assert stats.budget_exceeded == any(UNKNOWN_VAL in row for row in result)
+        exceeded += stats.budget_exceeded
+    assert exceeded > 0
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_large_budget(name: str) -> None:
+    solve = SOLVERS[name]
+    for field in random_fields(8, 10):
+        stats = SolveStats()
+        result = solve(
+            field,
+            False,
+            False,
+            stats=stats,
+            mark_safe=True,
+            deadline=time.monotonic() + 60,
+            max_nodes=10**9,
+        )
+        assert not stats.budget_exceeded
+        assert result == expected_solution(field, mark_safe=True)
+
+
+def test_backends_without_deadline() -> None:
+    field = [[1, -2], [-2, -2]]
+    with pytest.raises(ValueError):
+        pysat_solve(
+            field, False, False, deadline=time.monotonic() + 1, backend="cadical153"
+        )
+    with pytest.raises(ValueError):
+        pysat_solve(field, False, False, backend="kissat404")
+
+
+@pytest.mark.parametrize("raised", [False, True])
+def test_raised_deadline(raised: bool) -> None:
+    # The pigeonhole formula takes about 0.3s to refute
+    solver = pysat.solvers.Solver(bootstrap_with=PHP(8).clauses)
+    budget = Budget(deadline=time.monotonic() + 0.1)
+    if raised:
+        # As `SolveService` does when a request without a deadline joins
+        threading.Timer(0.01, setattr, (budget, "deadline", None)).start()
+        assert solve_limited(solver, [], budget) is False
+    else:
+        with pytest.raises(BudgetExceeded):
+            solve_limited(solver, [], budget)
+    solver.delete()
@@ -0,0 +1,78 @@
+from minesweeper import ComponentCache, pysat_solve
+from minesweeper.solver import construct_constraints
+
+import random
+
+from oracle import expected_solution, random_field, solutions
+
+# A 1-2-1 along an edge: the cells next to the 1s are mines
+ONE_TWO_ONE = [
+    [-2, -2, -2],
+    [1, 2, 1],
+]
+
+
+def mines_and_safe(field: list[list[int]]) -> tuple[list[int], list[int]]:
+    """Forced mines and safe cells of the frontier, from the oracle"""
+    _, vars_ = construct_constraints(field)
+    models = solutions(field)
+    return (
+        sorted(var for var in vars_ if all(var in model for model in models)),
+        sorted(var for var in vars_ if not any(var in model for model in models)),
+    )
+
+
+def transformed(field: list[list[int]]) -> list[list[list[int]]]:
+    """The field rotated, reflected and moved down in a larger field"""
+    rotated = [list(row) for row in zip(*field[::-1])]
+    reflected = [row[::-1] for row in field]
+    moved = [[-2] * len(field[0]) for _ in range(2)] + field
+    return [rotated, reflected, moved]
+
+
+def test_symmetric_components_hit() -> None:
+    cache = ComponentCache()
+    constraints, vars_ = construct_constraints(ONE_TWO_ONE)
+    cache.store(constraints, vars_, 3, *mines_and_safe(ONE_TWO_ONE))
+
+    for field in transformed(ONE_TWO_ONE):
+        constraints, vars_ = construct_constraints(field)
+        hit = cache.lookup(constraints, vars_, len(field[0]))
+        assert hit is not None
+        assert (sorted(hit[0]), sorted(hit[1])) == mines_and_safe(field)
+    assert cache.hits == 3
+
+
+def test_solves_match_oracle() -> None:
+    rng = random.Random(6)
+    cache = ComponentCache(maxsize=8)
+    for _ in range(60):
+        field, _ = random_field(rng, 4, 4, rng.randint(2, 5))
+        for mark_safe in (False, True):
+            result = pysat_solve(field, False, False, cache=cache, mark_safe=mark_safe)
+            assert result == expected_solution(field, mark_safe=mark_safe)
+    assert len(cache) <= 8
+    assert cache.hits > 0
+
+
+def test_max_vars() -> None:
+    cache = ComponentCache(max_vars=2)
+    constraints, vars_ = construct_constraints(ONE_TWO_ONE)
+    cache.store(constraints, vars_, 3, *mines_and_safe(ONE_TWO_ONE))
+    assert len(cache) == 0
+    assert cache.lookup(constraints, vars_, 3) is None
+
+
+def test_save_and_load(tmp_path) -> None:
+    path = str(tmp_path / "cache.json")
+    cache = ComponentCache(path=path)
+    constraints, vars_ = construct_constraints(ONE_TWO_ONE)
+    mines, safe = mines_and_safe(ONE_TWO_ONE)
+    cache.store(constraints, vars_, 3, mines, safe)
+    cache.save()
+
+    loaded = ComponentCache(path=path)
+    assert len(loaded) == 1
+    hit = loaded.lookup(constraints, vars_, 3)
+    assert hit is not None
+    assert (sorted(hit[0]), sorted(hit[1])) == (mines, safe)
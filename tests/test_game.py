@@ -0,0 +1,71 @@
+from minesweeper._global import FLAGGED_VAL, UNOPENED_VAL
+from minesweeper.game import Board, autoplay, play_many
+
+import pytest
+
+
+def test_board() -> None:
+    board = Board(9, 9, 10, seed=0)
+    opened = board.open(4, 4)
+
+    # The first click and its neighbors are never mines, the click opens a zero
+    assert (4, 4, 0) in opened
+    assert not {(4, 4), *board.neighbors(4, 4)} & board.mine_cells
+    assert len(board.mine_cells) == 10
+    assert board.opened == len(opened) == len(set(opened))
+    for i, j, value in opened:
+        assert board.field[i][j] == value == board.numbers[i][j]
+    assert board.open(4, 4) == []
+
+    i, j = min(board.mine_cells)
+    board.flag(i, j)
+    assert board.field[i][j] == FLAGGED_VAL
+    assert board.open(i, j) == []  # Flagged cells are not opened
+    board.field[i][j] = UNOPENED_VAL
+    assert board.open(i, j) == [] and board.lost and board.over and not board.won
+
+
+def test_board_is_seeded() -> None:
+    first, second = Board(16, 30, 99, seed=3), Board(16, 30, 99, seed=3)
+    assert first.open(8, 15) == second.open(8, 15)
+    assert first.mine_cells == second.mine_cells
+
+
+def test_invalid_board() -> None:
+    with pytest.raises(ValueError):
+        Board(3, 3, 9)
+
+
+@pytest.mark.parametrize("solver", [None, "pysat"])
+def test_autoplay(solver: str | None) -> None:
+    results = [autoplay(seed, 9, 9, 10, solver) for seed in range(5)]
+    assert [(result.won, result.moves) for result in results] == [
+        (True, 9),
+        (True, 11),
+        (True, 18),
+        (True, 12),
+        (True, 28),
+    ]
+
+    result = autoplay(3, 8, 8, 30, solver)
+    assert (result.won, result.moves, result.guesses) == (False, 15, 5)
+
+
+def test_play_many() -> None:
+    # The session and the solver called on the whole field play the same games
+    session, cold = play_many(4), play_many(4, solver="pysat")
+    for results in session, cold:
+        results.pop("time")
+        results.pop("moves_per_second")
+        for result in results["results"]:
+            result.pop("time")
+
+    assert session.pop("solver") == "session" and cold.pop("solver") == "pysat"
+    assert session == cold
+    assert (session["wins"], session["moves"], session["guesses"]) == (3, 741, 4)
+    assert [result["won"] for result in session["results"]] == [
+        True,
+        True,
+        True,
+        False,
+    ]
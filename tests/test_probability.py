@@ -0,0 +1,73 @@
+from minesweeper import mine_probabilities
+from minesweeper._global import Field, FLAGGED_VAL, UNOPENED_VAL
+from minesweeper.solver import construct_constraints, split_components
+
+import random
+
+import pytest
+
+from oracle import random_field, solutions
+
+
+@pytest.mark.parametrize("use_total", [False, True])
+def test_matches_oracle(use_total: bool) -> None:
+    rng = random.Random(4)
+    for _ in range(40):
+        field, mines = random_field(
+            rng, rng.randint(3, 5), rng.randint(3, 5), rng.randint(2, 6)
+        )
+        check_probabilities(field, mines if use_total else None)
+
+
+def check_probabilities(field: Field, total_mines: int | None) -> None:
+    models = solutions(field, total_mines)
+    _, frontier = construct_constraints(field)
+    width = len(field[0])
+
+    probabilities = mine_probabilities(field, total_mines)
+    for i, row in enumerate(field):
+        for j, value in enumerate(row):
+            var = i * width + j + 1
+            if value == FLAGGED_VAL:
+                assert probabilities[i][j] == 1.0
+            elif value != UNOPENED_VAL:
+                assert probabilities[i][j] is None
+            elif total_mines is None and var not in frontier:
+                # Cells next to no number are only known with the total
+                assert probabilities[i][j] is None
+            else:
+                expected = sum(var in model for model in models) / len(models)
+                assert probabilities[i][j] == pytest.approx(expected)
+
+
+def test_many_components() -> None:
+    # Small fields side by side, separated by columns of flags (counted by the
+    # numbers next to them), so that the frontier splits into many components
+    rng = random.Random(21)
+    for _ in range(5):
+        field: Field = [[] for _ in range(3)]
+        mines = 0
+        for tile in range(4):
+            if tile:
+                for row in field:
+                    row.append(FLAGGED_VAL)
+                mines += 3
+            tile_field, tile_mines = random_field(
+                rng, 3, 3, 2, max_unopened=6, flag_rate=0
+            )
+            mines += tile_mines
+            for i, row in enumerate(tile_field):
+                for j, value in enumerate(row):
+                    if value >= 0 and (j == 0 and tile or j == 2 and tile < 3):
+                        value += len(range(max(0, i - 1), min(3, i + 2)))
+                    field[i].append(value)
+
+        assert len(split_components(*construct_constraints(field))) >= 4
+        check_probabilities(field, mines)
+
+
+def test_unsolvable() -> None:
+    with pytest.raises(ValueError):
+        mine_probabilities([[2, -2]])
+    with pytest.raises(ValueError):
+        mine_probabilities([[1, -2], [-2, -2]], total_mines=5)
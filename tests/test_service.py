@@ -0,0 +1,151 @@
+from minesweeper import SolveService, SolveStats, solve_async
+from minesweeper._global import UNKNOWN_VAL
+from minesweeper.budget import Budget
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from oracle import expected_solution, random_field
+
+
+def counting_service(
+    event: threading.Event | None = None, **kwargs: Any
+) -> tuple[SolveService, list]:
+    """Service whose solves are recorded, and wait for `event` when given"""
+    service = SolveService(**kwargs)
+    solve = service.solve
+    calls = []
+
+    def recorded_solve(field, **kwargs):
+        calls.append(field)
+        if event is not None:
+            event.wait(10)
+        return solve(field, **kwargs)
+
+    service.solve = recorded_solve
+    return service, calls
+
+
+def test_matches_oracle() -> None:
+    rng = random.Random(20)
+    fields = [random_field(rng, 4, 4, 3)[0] for _ in range(10)]
+
+    async def main() -> list:
+        return await asyncio.gather(
+            *(solve_async(field, mark_safe=True) for field in fields)
+        )
+
+    for field, result in zip(fields, asyncio.run(main())):
+        assert result == expected_solution(field, mark_safe=True)
+
+
+def test_coalescing() -> None:
+    field = [[1, -2], [-2, -2]]
+    service, calls = counting_service()
+    stats = [SolveStats(), SolveStats()]
+
+    async def main() -> list:
+        now = time.monotonic()
+        # The deadlines and statistics belong to the callers, not to the solve
+        results = await asyncio.gather(
+            service.solve_async(field, deadline=now + 60, stats=stats[0]),
+            service.solve_async(field, deadline=now + 120, stats=stats[1]),
+        )
+        await service.close()
+        return results
+
+    first, second = asyncio.run(main())
+    assert len(calls) == 1
+    assert first == second == expected_solution(field)
+    assert stats[0] == stats[1] and stats[0].sat_calls > 0
+
+
+def test_merged_limits() -> None:
+    field = [[1, -2], [-2, -2]]
+    event = threading.Event()
+    service, calls = counting_service(event)
+
+    async def main() -> None:
+        now = time.monotonic()
+        tasks = [
+            asyncio.create_task(service.solve_async(field, deadline=now + 60)),
+            asyncio.create_task(service.solve_async(field, deadline=now + 120)),
+        ]
+        await asyncio.sleep(0.05)
+        (job,) = service.jobs.values()
+        assert job.budget.deadline == now + 120
+
+        tasks.append(asyncio.create_task(service.solve_async(field)))
+        await asyncio.sleep(0.05)
+        assert job.budget.deadline is None
+
+        event.set()
+        await asyncio.gather(*tasks)
+        await service.close()
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_own_budget() -> None:
+    field = [[1, -2], [-2, -2]]
+    service, calls = counting_service()
+
+    async def main() -> list:
+        results = await asyncio.gather(
+            service.solve_async(field, budget=Budget()),
+            service.solve_async(field, budget=Budget()),
+        )
+        await service.close()
+        return results
+
+    assert asyncio.run(main()) == [expected_solution(field)] * 2
+    # A budget of the caller may be cancelled by it, so it is not shared
+    assert len(calls) == 2
+
+
+def test_backpressure() -> None:
+    event = threading.Event()
+    service, calls = counting_service(event, workers=2, max_pending=1)
+    fields = [[[1, -2]], [[-2, 1]]]
+
+    async def main() -> None:
+        tasks = [asyncio.create_task(service.solve_async(field)) for field in fields]
+        await asyncio.sleep(0.05)
+        # The second request waits for the slot of the first one
+        assert len(calls) == 1
+        assert not any(task.done() for task in tasks)
+
+        event.set()
+        assert await asyncio.gather(*tasks) == [[[1, -1]], [[-1, 1]]]
+        await service.close()
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_cancel_stops_the_search() -> None:
+    # The brute force would take ages on its 65 undecided cells
+    field, _ = random_field(random.Random(0), 16, 16, 40, max_unopened=150, flag_rate=0)
+    service = SolveService("brute_force", workers=1)
+
+    async def main() -> None:
+        task = asyncio.create_task(service.solve_async(field))
+        await asyncio.sleep(0.1)
+        (job,) = service.jobs.values()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert job.budget.cancelled
+        result = await asyncio.wait_for(job.future, 10)
+        assert job.stats.budget_exceeded
+        assert any(UNKNOWN_VAL in row for row in result)
+        await service.close()
+
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+from minesweeper import SolverSession
+from minesweeper._global import FLAGGED_VAL, UNOPENED_VAL
+
+import random
+
+import pytest
+
+from oracle import expected_solution, open_cell, random_game
+
+
+@pytest.mark.parametrize("use_total", [False, True])
+def test_moves_match_oracle(use_total: bool) -> None:
+    rng = random.Random(5)
+    for _ in range(15):
+        height, width = rng.randint(3, 5), rng.randint(3, 5)
+        mines = rng.randint(2, 6)
+        mine_cells, numbers = random_game(rng, height, width, mines)
+        total_mines = mines if use_total else None
+
+        # Start small enough for the oracle
+        field = [[UNOPENED_VAL] * width for _ in range(height)]
+        safe = list(numbers)
+        rng.shuffle(safe)
+        while sum(row.count(UNOPENED_VAL) for row in field) > 12:
+            open_cell(field, numbers, *safe.pop())
+
+        with SolverSession(field, total_mines) as session:
+            while True:
+                expected = expected_solution(field, total_mines, mark_safe=True)
+                assert session.deduce(mark_safe=True) == expected
+                assert session.deduce() == expected_solution(field, total_mines)
+
+                if rng.random() < 0.3:
+                    flags = [
+                        (i, j) for i, j in mine_cells if field[i][j] != FLAGGED_VAL
+                    ]
+                    if flags:
+                        i, j = rng.choice(flags)
+                        field[i][j] = FLAGGED_VAL
+                        session.flag(i, j)
+                        continue
+
+                safe = [(i, j) for i, j in numbers if field[i][j] == UNOPENED_VAL]
+                if not safe:
+                    break
+                session.open_cells(open_cell(field, numbers, *rng.choice(safe)))
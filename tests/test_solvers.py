@@ -0,0 +1,327 @@
+from minesweeper import ArrayField, ComponentCache, SolveStats, pysat_solver, solver
+from minesweeper._global import UNOPENED_VAL
+from minesweeper.dpll_solver import DPLL
+from minesweeper.numpy_kb import NumpyKB
+from minesweeper.pysat_solver import interruptible, select_backend
+from minesweeper.registry import SOLVERS
+from minesweeper.solver import (
+    KB,
+    construct_constraints,
+    construct_constraints_vectorized,
+    propagate,
+    split_components,
+)
+
+import random
+import time
+from itertools import product
+
+import pytest
+from pysat.examples.genhard import PHP
+
+from oracle import expected_solution, random_field, solutions
+
+BOARDS = 30
+
+
+def random_fields(seed: int) -> list[tuple[list[list[int]], int]]:
+    rng = random.Random(seed)
+    return [
+        random_field(rng, rng.randint(3, 5), rng.randint(3, 5), rng.randint(2, 6))
+        for _ in range(BOARDS)
+    ]
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+@pytest.mark.parametrize("mark_safe", [False, True])
+def test_matches_oracle(name: str, mark_safe: bool) -> None:
+    solve = SOLVERS[name]
+    for field, _ in random_fields(0):
+        expected = expected_solution(field, mark_safe=mark_safe)
+        assert solve(field, True, False, mark_safe=mark_safe) == expected
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+@pytest.mark.parametrize("mark_safe", [False, True])
+def test_total_mines_matches_oracle(name: str, mark_safe: bool) -> None:
+    solve = SOLVERS[name]
+    for field, mines in random_fields(1):
+        expected = expected_solution(field, mines, mark_safe)
+        result = solve(field, True, False, mark_safe=mark_safe, total_mines=mines)
+        assert result == expected
+
+
+@pytest.mark.parametrize("name", ["backtracking", "dpll"])
+@pytest.mark.parametrize("mark_safe", [False, True])
+def test_cdcl_matches_oracle(name: str, mark_safe: bool) -> None:
+    solve = SOLVERS[name]
+    for field, mines in random_fields(4):
+        for total_mines in (None, mines):
+            expected = expected_solution(field, total_mines, mark_safe)
+            result = solve(
+                field,
+                True,
+                False,
+                mark_safe=mark_safe,
+                total_mines=total_mines,
+                cdcl=True,
+            )
+            assert result == expected
+
+
+@pytest.mark.parametrize("mark_safe", [False, True])
+def test_a_star_numpy_matches_oracle(mark_safe: bool) -> None:
+    solve = SOLVERS["a_star"]
+    for field, mines in random_fields(5):
+        for total_mines in (None, mines):
+            expected = expected_solution(field, total_mines, mark_safe)
+            result = solve(
+                field,
+                True,
+                False,
+                use_numpy=True,
+                mark_safe=mark_safe,
+                total_mines=total_mines,
+            )
+            assert result == expected
+
+
+@pytest.mark.parametrize("name", ["a_star", "a_star_inc"])
+def test_max_explored(name: str) -> None:
+    # Propagation leaves 65 cells of this field to the search
+    rng = random.Random(0)
+    field, _ = random_field(rng, 16, 16, 40, max_unopened=150, flag_rate=0)
+    with pytest.raises(MemoryError):
+        SOLVERS[name](field, False, False, max_explored=5)
+
+    for field, _ in random_fields(6):
+        result = SOLVERS[name](field, True, False, max_explored=10**5)
+        assert result == expected_solution(field)
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_cache_gives_the_same_results(name: str) -> None:
+    solve = SOLVERS[name]
+    cache = ComponentCache()
+    stats = SolveStats()
+    # Twice over the same fields, so the second pass hits the cache
+    for field, mines in random_fields(2) * 2:
+        expected = expected_solution(field, mines, mark_safe=True)
+        result = solve(
+            field,
+            False,
+            False,
+            cache=cache,
+            stats=stats,
+            mark_safe=True,
+            total_mines=mines,
+        )
+        assert result == expected
+    assert stats.cache_hits > 0
+    assert (stats.cache_hits, stats.cache_misses) == (cache.hits, cache.misses)
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_array_field(name: str) -> None:
+    solve = SOLVERS[name]
+    for field, _ in random_fields(3)[:5]:
+        board = ArrayField.from_field(field)
+        result = solve(board, False, False, mark_safe=True)
+        assert isinstance(result, ArrayField)
+        assert result == expected_solution(field, mark_safe=True)
+        # The input is left as it was
+        assert board == field
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_stats(name: str) -> None:
+    solve = SOLVERS[name]
+    for field, _ in random_fields(13):
+        constraints, vars_ = construct_constraints(field)
+        stats = SolveStats()
+        solve(field, True, False, stats=stats)
+
+        assert (stats.vars, stats.constraints) == (len(vars_), len(constraints))
+        assert stats.residual_vars <= stats.vars
+        # Every component left by propagation is searched at least once
+        assert stats.sat_calls >= stats.components
+        assert stats.construct_time >= 0 and stats.deduction_time >= 0
+        assert stats.as_dict()["vars"] == stats.vars
+
+
+def test_split_components() -> None:
+    rng = random.Random(10)
+    for _ in range(20):
+        field, _ = random_field(rng, 8, 8, 10, max_unopened=40)
+        constraints, vars_ = construct_constraints(field)
+        components = split_components(constraints, vars_)
+
+        component_of = {
+            var: k for k, (_, comp_vars) in enumerate(components) for var in comp_vars
+        }
+        assert sorted(component_of) == sorted(vars_)
+        assert sum(len(comp_constraints) for comp_constraints, _ in components) == len(
+            constraints
+        )
+        for k, (comp_constraints, _) in enumerate(components):
+            for constraint in comp_constraints:
+                assert {component_of[var] for var in constraint.vars} == {k}
+
+
+def test_vectorized_constraints(monkeypatch: pytest.MonkeyPatch) -> None:
+    rng = random.Random(14)
+    for _ in range(3):
+        field, _ = random_field(rng, 60, 60, 700, max_unopened=1800)
+        board = ArrayField.from_field(field)
+        expected = construct_constraints_vectorized(board)
+        assert construct_constraints(field) == expected
+
+        # The loop the smaller boards go through
+        monkeypatch.setattr(solver, "VECTORIZE_MIN_CELLS", len(board.cells) + 1)
+        assert construct_constraints(board) == expected
+        monkeypatch.undo()
+
+
+def test_numpy_kb() -> None:
+    rng = random.Random(15)
+    vars_ = list(range(1, 9))
+    for _ in range(20):
+        clauses = [
+            [rng.choice((1, -1)) * var for var in rng.sample(vars_, rng.randint(1, 4))]
+            for _ in range(12)
+        ]
+        kb = KB(clauses, vars_, create_idx_dict=True)
+        numpy_kb = NumpyKB(clauses, vars_, create_idx_dict=True)
+
+        models = [rng.getrandbits(len(vars_)) for _ in range(5)]
+        assert list(numpy_kb.num_false_clauses_batch(models)) == [
+            kb.num_false_clauses(model) for model in models
+        ]
+        idxs = list(range(len(vars_)))
+        for model in models:
+            deltas = [kb.flip_delta(model, idx) for idx in idxs]
+            assert list(numpy_kb.flip_deltas(model, idxs)) == deltas
+            assert [numpy_kb.flip_delta(model, idx) for idx in idxs] == deltas
+
+            partial = {var: bool(model >> idx & 1) for idx, var in enumerate(vars_)}
+            for var in rng.sample(vars_, 4):
+                del partial[var]
+            answer = kb.is_satisfied_extended(partial)
+            assert numpy_kb.is_satisfied_extended(partial) == answer
+
+    # Like KB, the occurrences are only indexed when asked for
+    assert not hasattr(NumpyKB(clauses, vars_), "occurrences")
+
+
+def test_constraints_count_the_solutions() -> None:
+    for field, _ in random_fields(11):
+        constraints, vars_ = construct_constraints(field)
+        models = 0
+        for values in product((False, True), repeat=len(vars_)):
+            mines = {var for var, mine in zip(vars_, values) if mine}
+            models += all(
+                sum(var in mines for var in constraint.vars) == constraint.count
+                for constraint in constraints
+            )
+        # The unopened cells next to no number are free
+        free = sum(row.count(UNOPENED_VAL) for row in field) - len(vars_)
+        assert models * 2**free == len(solutions(field))
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+@pytest.mark.parametrize(
+    "field, total_mines",
+    [
+        ([[2, -2]], None),
+        ([[1, -1], [-1, -2]], None),
+        ([[1, -2], [-2, -2]], 5),
+        # No unopened cell is left for the missing mine
+        ([[1, -1], [1, 1]], 2),
+    ],
+)
+def test_unsolvable(name: str, field: list[list[int]], total_mines: int | None) -> None:
+    with pytest.raises(ValueError):
+        SOLVERS[name](field, True, False, total_mines=total_mines)
+
+
+def test_propagate_keeps_the_solutions() -> None:
+    for field, _ in random_fields(12):
+        constraints, vars_ = construct_constraints(field)
+        mines, safe, residual, residual_vars = propagate(constraints, vars_)
+        models = solutions(field)
+
+        # Decided cells are decided in every solution
+        for model in models:
+            assert all(var in model for var in mines)
+            assert not any(var in model for var in safe)
+        assert not set(residual_vars) & (set(mines) | set(safe))
+        # and the residual constraints still hold in every solution
+        for model in models:
+            for constraint in residual:
+                assert sum(var in model for var in constraint.vars) == constraint.count
+
+
+def test_learned_clauses_reduction() -> None:
+    # The pigeonhole clauses of 7 pigeons, switched on by `on`. Refuting them
+    # learns more clauses than are kept, the boards never learn that many.
+    php = PHP(6).clauses
+    on = max(abs(lit) for clause in php for lit in clause) + 1
+    dpll = DPLL([clause + [-on] for clause in php], list(range(1, on + 1)), learn=True)
+
+    assert dpll.solve({on: True}) is None
+    learned = len(dpll.clauses) - dpll.num_original
+    assert learned > dpll.max_learned
+
+    model = dpll.solve({on: False})
+    assert model is not None and not model[on]
+    assert len(dpll.clauses) - dpll.num_original < learned
+    # What was learned before still holds
+    assert dpll.solve({on: True}) is None
+
+
+def test_select_backend() -> None:
+    assert select_backend(799, 109) == "minisat22"
+    assert select_backend(800, 10) == select_backend(10, 110) == "cadical153"
+    assert select_backend(800, 110, deadline=True) == "glucose3"
+    assert select_backend(10, 10, deadline=True) == "minisat22"
+    for size in (10, 1000):
+        assert interruptible(select_backend(size, size, deadline=True))
+
+
+def test_auto_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    chosen = []
+
+    def recorded_select_backend(*args) -> str:
+        chosen.append(select_backend(*args))
+        return chosen[-1]
+
+    monkeypatch.setattr(pysat_solver, "select_backend", recorded_select_backend)
+    solve = pysat_solver.pysat_solve
+
+    for field, mines in random_fields(7):
+        expected = expected_solution(field, mines, mark_safe=True)
+        result = solve(
+            field, True, False, mark_safe=True, total_mines=mines, backend="auto"
+        )
+        assert result == expected
+    assert set(chosen) == {"minisat22"}
+
+    # The global mine count makes one large component of this expert field
+    rng = random.Random(0)
+    field, mines = random_field(rng, 16, 30, 99, max_unopened=240, flag_rate=0)
+    expected = solve(field, False, False, mark_safe=True, total_mines=mines)
+    for deadline, backend in [(None, "cadical153"), (60, "glucose3")]:
+        if deadline is not None:
+            deadline += time.monotonic()
+        chosen.clear()
+        result = solve(
+            field,
+            False,
+            False,
+            mark_safe=True,
+            total_mines=mines,
+            deadline=deadline,
+            backend="auto",
+        )
+        assert result == expected
+        assert set(chosen) == {backend}
@@ -0,0 +1,43 @@
+from minesweeper import iter_fields, read_field, write_field, write_fields
+from minesweeper._global import FLAGGED_VAL, SAFE_VAL, UNKNOWN_VAL, UNOPENED_VAL
+
+import random
+
+import pytest
+
+from oracle import random_field
+
+
+def test_round_trip(tmp_path) -> None:
+    path = str(tmp_path / "field.txt")
+    field = [
+        [0, 1, UNOPENED_VAL],
+        [2, FLAGGED_VAL, SAFE_VAL],
+        [8, UNKNOWN_VAL, 3],
+    ]
+    write_field(field, path)
+    assert read_field(path) == field
+    assert list(iter_fields(path)) == [field]
+
+
+def test_many_fields(tmp_path) -> None:
+    path = str(tmp_path / "fields.txt")
+    rng = random.Random(16)
+    fields = [
+        random_field(rng, rng.randint(1, 6), rng.randint(1, 6), 1)[0]
+        for _ in range(10)
+    ]
+
+    # Streamed from a generator, then added to the end of the file
+    assert write_fields((field for field in fields[:6]), path) == 6
+    assert write_fields(fields[6:], path, append=True) == 4
+    assert list(iter_fields(path)) == fields
+
+    # Appending to an empty file leaves no blank line before the first field
+    empty = str(tmp_path / "empty.txt")
+    write_fields([], empty)
+    write_fields(fields[:1], empty, append=True)
+    assert read_field(empty) == fields[0]
+
+    with pytest.raises(ValueError):
+        read_field(path)